@@ -0,0 +1,32 @@
+"""
+Registry of the raster images used by the lab scenes.
+
+Files are deduplicated by content hash, so identical copies of an asset resolve
+to one canonical path. manimgl caches textures per path, so every instance of
+an image shares a single decode and GPU upload. Instances are copied from one
+template per image, which shares its pixel buffer instead of reopening the file.
+"""
+
+import hashlib
+from functools import cache
+from pathlib import Path
+
+from manimlib import ImageMobject
+
+_canonical_paths: dict[str, str] = {}
+_templates: dict[str, ImageMobject] = {}
+
+
+@cache
+def get_canonical_path(path: str) -> str:
+    """Path of the first registered file with the same contents as `path`"""
+    digest = hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    return _canonical_paths.setdefault(digest, str(Path(path).resolve()))
+
+
+def get_image(path: str) -> ImageMobject:
+    """A fresh ImageMobject of the image at `path`"""
+    canonical_path = get_canonical_path(path)
+    if canonical_path not in _templates:
+        _templates[canonical_path] = ImageMobject(canonical_path)
+    return _templates[canonical_path].copy()
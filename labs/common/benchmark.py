@@ -0,0 +1,92 @@
+"""
+Code slides that show the real implementation next to how fast it runs.
+
+The listing is the source of the function the labs actually run, so it cannot
+drift from the code, and the call is timed while the scene renders and compared
+against the budget of the car's control loop. With LAB_BENCHMARK naming a
+directory, each timing is frozen there by the first render that measures it
+and later renders show it again, so their frames repeat. The render driver
+gives every probe its own directory and the regression harness keeps one next
+to its baselines. manimlib is only imported to build the slide, since importing
+it parses the command line of whatever process does so.
+"""
+
+import inspect
+import json
+import os
+import tempfile
+import textwrap
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from labs.common.profiling import time_call
+
+if TYPE_CHECKING:
+    from manimlib import VGroup
+
+CONTROL_RATE = 40
+BENCHMARK_ENV = "LAB_BENCHMARK"
+
+
+def get_source(func) -> str:
+    return textwrap.dedent(inspect.getsource(func)).rstrip()
+
+
+def get_benchmark_text(name: str, seconds: float, rate: float = CONTROL_RATE) -> str:
+    return (
+        f"{name}: {seconds * 1e9:,.0f} ns/call, {1 / seconds:,.0f} calls/s, "
+        f"{seconds * rate:.3%} of the {1000 / rate:g} ms budget at {rate:g} Hz"
+    )
+
+
+def get_timing(func, *args, name: str, measure: bool = True) -> float | None:
+    """
+    Seconds per call of func(*args), frozen under LAB_BENCHMARK when it is set.
+
+    Returns None when the call has no frozen timing and `measure` is off.
+    """
+    directory = os.environ.get(BENCHMARK_ENV)
+    path = None if directory is None else Path(directory) / f"{name}.json"
+    if path is not None and path.exists():
+        return json.loads(path.read_text())
+    if not measure:
+        return None
+    seconds = time_call(func, *args)
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Sections render in parallel, so write to a temporary file and rename
+        # it into place to never expose a partial timing
+        with tempfile.NamedTemporaryFile("w", dir=path.parent, delete=False) as file:
+            json.dump(seconds, file)
+        os.replace(file.name, path)
+    return seconds
+
+
+def get_benchmarked_code(func, *args, name: str, measure: bool = True) -> "VGroup":
+    """
+    Listing of `func` above its measured or frozen speed.
+
+    Args:
+        func: function that is shown and timed, bound methods work too
+        *args: arguments of the timed call
+        name: label of the measurement and name of its frozen timing
+        measure: time the call if it has no frozen timing, off for sections
+            that are replayed with animations skipped
+    """
+    from manimlib import DOWN, FRAME_HEIGHT, FRAME_WIDTH, YELLOW, Text, VGroup
+
+    from labs.common.code_blocks import get_code
+
+    code = get_code(get_source(func))
+    seconds = get_timing(func, *args, name=name, measure=measure)
+    if seconds is None:
+        text = f"{name}: not measured"
+    else:
+        text = get_benchmark_text(name, seconds)
+    label = Text(text, font_size=24, color=YELLOW)
+    return (
+        VGroup(code, label)
+        .arrange(DOWN)
+        .set_max_height(FRAME_HEIGHT - 1)
+        .set_max_width(FRAME_WIDTH - 1)
+    )
@@ -0,0 +1,123 @@
+import math
+
+import numpy as np
+from manimlib import (
+    Axes,
+    Dot,
+    Line,
+    ParametricCurve,
+    ValueTracker,
+    VGroup,
+    normalize,
+)
+
+
+class IncrementalRiemannRectangles(VGroup):
+    """
+    Riemann rectangles of a graph from the start of `x_range` up to a moving edge.
+
+    Every rectangle up to the end of `x_range` is built once, exactly as
+    `axes.get_riemann_rectangles` would build them for the whole range. Moving
+    the edge only adds or removes the rectangles it passes, so a frame costs
+    O(1) instead of rebuilding the group. Colors follow the full range, so once
+    the edge reaches the end the rectangles match get_riemann_rectangles.
+
+    Args:
+        axes: axes the graph is plotted on
+        graph: graph under which the rectangles stand
+        x_range: (start, end) of the rectangles the edge can reveal
+        dx: width of each rectangle in graph coordinates
+        **kwargs: style arguments passed to get_riemann_rectangles
+    """
+
+    def __init__(
+        self,
+        axes: Axes,
+        graph: ParametricCurve,
+        x_range: tuple[float, float],
+        dx: float,
+        **kwargs,
+    ):
+        super().__init__()
+        self.start = x_range[0]
+        self.dx = dx
+        self.buffer = axes.get_riemann_rectangles(
+            graph, x_range=list(x_range), dx=dx, **kwargs
+        )
+        self.count = 0
+
+    def get_count(self, x: float) -> int:
+        """Rectangles get_riemann_rectangles shows for the range (start, x)"""
+        # np.arange(start, x + dx, dx) has ceil((x + dx - start) / dx) samples
+        count = math.ceil((x + self.dx - self.start) / self.dx) - 1
+        return min(max(count, 0), len(self.buffer))
+
+    def set_edge(self, x: float):
+        count = self.get_count(x)
+        if count > self.count:
+            self.add(*self.buffer[self.count : count])
+        elif count < self.count:
+            self.remove(*self.buffer[count : self.count])
+        self.count = count
+        return self
+
+
+class GraphSecant(Line):
+    """
+    Secant of a graph between x and x + dx, where x follows `tracker`.
+
+    The line keeps a fixed length, centered between the two graph points, and
+    its points are updated in place every frame. Both graph points are
+    evaluated once per tracker value and shared with the dots from get_dot, so
+    the line and its dots cost two graph evaluations per frame. A small dx
+    gives a tangent.
+
+    Args:
+        axes: axes the graph is plotted on
+        graph: graph the secant cuts
+        tracker: tracker holding x
+        dx: distance between the two points in graph coordinates
+        length: length of the drawn line
+    """
+
+    def __init__(
+        self,
+        axes: Axes,
+        graph: ParametricCurve,
+        tracker: ValueTracker,
+        dx: float,
+        length: float = 4,
+        **kwargs,
+    ):
+        self.axes = axes
+        self.graph = graph
+        self.tracker = tracker
+        self.dx = dx
+        self.length = length
+        self.cached_x = None
+        self.cached_points = None
+        super().__init__(*self.get_line_ends(), **kwargs)
+        self.add_updater(lambda m: m.set_points_by_ends(*m.get_line_ends()))
+
+    def get_graph_points(self) -> tuple[np.ndarray, np.ndarray]:
+        """Graph points at x and x + dx, evaluated once per tracker value"""
+        x = self.tracker.get_value()
+        if x != self.cached_x:
+            self.cached_x = x
+            self.cached_points = (
+                self.axes.i2gp(x, self.graph),
+                self.axes.i2gp(x + self.dx, self.graph),
+            )
+        return self.cached_points
+
+    def get_line_ends(self) -> tuple[np.ndarray, np.ndarray]:
+        start, end = self.get_graph_points()
+        center = (start + end) / 2
+        half = normalize(end - start) * self.length / 2
+        return center - half, center + half
+
+    def get_dot(self, index: int, **kwargs) -> Dot:
+        """Dot that follows the graph point at x (index 0) or x + dx (index 1)"""
+        dot = Dot(**kwargs)
+        dot.add_updater(lambda m: m.move_to(self.get_graph_points()[index]))
+        return dot
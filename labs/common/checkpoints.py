@@ -0,0 +1,175 @@
+"""
+Snapshots of a scene's state at section boundaries.
+
+A checkpoint holds the mobjects on screen with their updaters, the attributes
+sections hand to each other, the scene clock and both random generators.
+Updaters are mostly closures, which plain pickle refuses, so functions that
+can't be found by name are pickled by value: their code, defaults and closure
+cells. The scene itself, its camera frame, module globals and the classes and
+functions of the scene module, which manimgl loads outside of sys.modules, are
+pickled as references and resolved against the running scene when loading. The
+frame's state is saved as a copy and restored onto the live frame. Shader
+wrappers hold GPU objects and are dropped; mobjects rebuild them on their next
+render.
+"""
+
+import io
+import marshal
+import os
+import pickle
+import random
+import sys
+import tempfile
+import types
+from pathlib import Path
+
+import numpy as np
+from manimlib import Scene
+from manimlib.shader_wrapper import ShaderWrapper
+
+
+def make_cell():
+    return types.CellType()
+
+
+def set_cell_contents(cell: types.CellType, contents) -> None:
+    cell.cell_contents = contents
+
+
+def make_function(code, globals_, name, qualname, defaults, kwdefaults, closure):
+    function = types.FunctionType(
+        marshal.loads(code), globals_, name, defaults, closure
+    )
+    function.__qualname__ = qualname
+    function.__kwdefaults__ = kwdefaults
+    return function
+
+
+def get_scene_globals(scene: Scene) -> dict:
+    """Globals of the module that defines the scene class"""
+    for value in vars(type(scene)).values():
+        if isinstance(value, types.FunctionType):
+            return value.__globals__
+    return vars(sys.modules[type(scene).__module__])
+
+
+def is_importable(obj) -> bool:
+    module = sys.modules.get(getattr(obj, "__module__", None))
+    target = module
+    for part in obj.__qualname__.split("."):
+        target = getattr(target, part, None)
+    return target is obj
+
+
+class ScenePickler(pickle.Pickler):
+    def __init__(self, file, scene: Scene, scene_globals: dict):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.scene = scene
+        self.scene_globals = scene_globals
+        self.module_globals = {
+            id(module.__dict__): name for name, module in sys.modules.items()
+        }
+
+    def persistent_id(self, obj):
+        if obj is self.scene:
+            return ("scene",)
+        if obj is self.scene.camera.frame:
+            return ("frame",)
+        if obj is self.scene_globals:
+            return ("scene_globals",)
+        if isinstance(obj, dict) and id(obj) in self.module_globals:
+            return ("module_globals", self.module_globals[id(obj)])
+        if (
+            isinstance(obj, (type, types.FunctionType))
+            and self.scene_globals.get(obj.__name__) is obj
+        ):
+            return ("scene_global", obj.__name__)
+        return None
+
+    def reducer_override(self, obj):
+        if isinstance(obj, ShaderWrapper):
+            return type(None), ()
+        if isinstance(obj, types.CellType):
+            try:
+                contents = obj.cell_contents
+            except ValueError:
+                return make_cell, ()
+            # Created empty first, so closures that refer to themselves resolve
+            return make_cell, (), contents, None, None, set_cell_contents
+        if isinstance(obj, types.FunctionType) and not is_importable(obj):
+            return make_function, (
+                marshal.dumps(obj.__code__),
+                obj.__globals__,
+                obj.__name__,
+                obj.__qualname__,
+                obj.__defaults__,
+                obj.__kwdefaults__,
+                obj.__closure__,
+            )
+        return NotImplemented
+
+
+class SceneUnpickler(pickle.Unpickler):
+    def __init__(self, file, scene: Scene, scene_globals: dict):
+        super().__init__(file)
+        self.scene = scene
+        self.scene_globals = scene_globals
+
+    def persistent_load(self, pid):
+        kind, *args = pid
+        if kind == "scene":
+            return self.scene
+        if kind == "frame":
+            return self.scene.camera.frame
+        if kind == "scene_globals":
+            return self.scene_globals
+        if kind == "module_globals":
+            return sys.modules[args[0]].__dict__
+        if kind == "scene_global":
+            return self.scene_globals[args[0]]
+        raise pickle.UnpicklingError(f"Unknown persistent id {pid!r}")
+
+
+def save_checkpoint(scene: Scene, path: Path, attributes: list[str]) -> None:
+    """Write the state of `scene`, with the named scene attributes, to `path`"""
+    scene_globals = get_scene_globals(scene)
+    state = {
+        "mobjects": scene.mobjects,
+        "frame": scene.camera.frame.copy(),
+        "attributes": {name: getattr(scene, name) for name in attributes},
+        "time": scene.time,
+        "num_plays": scene.num_plays,
+        "numpy_random": np.random.get_state(),
+        "random": random.getstate(),
+    }
+    buffer = io.BytesIO()
+    ScenePickler(buffer, scene, scene_globals).dump(state)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Scenes are probed and rendered in parallel, so write to a temporary file
+    # of our own and rename it into place to never expose a partial checkpoint
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as file:
+        file.write(buffer.getvalue())
+    os.replace(file.name, path)
+
+
+def load_checkpoint(scene: Scene, path: Path) -> None:
+    """Replace the state of `scene` with the checkpoint at `path`"""
+    scene_globals = get_scene_globals(scene)
+    with open(path, "rb") as file:
+        state = SceneUnpickler(file, scene, scene_globals).load()
+    frame = scene.camera.frame
+    for mobject in state["mobjects"]:
+        if mobject is frame:
+            continue
+        for member in mobject.get_family():
+            member.shader_wrapper = None
+            member._data_has_changed = True
+    frame.become(state["frame"])
+    scene.clear()
+    scene.add(*state["mobjects"])
+    for name, value in state["attributes"].items():
+        setattr(scene, name, value)
+    scene.time = state["time"]
+    scene.num_plays = state["num_plays"]
+    np.random.set_state(state["numpy_random"])
+    random.setstate(state["random"])
@@ -0,0 +1,59 @@
+"""
+On-disk cache of syntax-highlighted Code mobjects.
+
+Building a Code block highlights the source with pygments, renders the markup
+to SVG and parses it into paths, and every manimgl process of a render does it
+again for every block it replays. The finished mobject is pickled under
+.render_cache/code, keyed by the source text, the highlighting and font
+arguments and the manimgl version, so later renders only unpickle it.
+"""
+
+import os
+import pickle
+import tempfile
+
+from manimlib import Code
+
+from labs.common.render import CACHE_DIR, get_manim_version, hash_text
+
+CODE_CACHE_DIR = CACHE_DIR / "code"
+
+_templates: dict[str, Code] = {}
+
+
+def get_code(
+    code: str,
+    language: str = "python",
+    code_style: str = "monokai",
+    font: str = "Consolas",
+    font_size: int = 24,
+    **kwargs,
+) -> Code:
+    """A fresh Code mobject, built once per distinct source and style"""
+    options = dict(
+        language=language,
+        code_style=code_style,
+        font=font,
+        font_size=font_size,
+        **kwargs,
+    )
+    key = hash_text(code, repr(sorted(options.items())), get_manim_version())
+    if key not in _templates:
+        _templates[key] = load_or_build(key, code, options)
+    return _templates[key].copy()
+
+
+def load_or_build(key: str, code: str, options: dict) -> Code:
+    path = CODE_CACHE_DIR / f"{key}.pkl"
+    if path.exists():
+        with open(path, "rb") as file:
+            return pickle.load(file)
+
+    mobject = Code(code, **options)
+    CODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # Sections render in parallel, so write to a temporary file and rename it
+    # into place to never expose a partial pickle
+    with tempfile.NamedTemporaryFile(dir=CODE_CACHE_DIR, delete=False) as file:
+        file.write(mobject.copy().serialize())
+    os.replace(file.name, path)
+    return mobject
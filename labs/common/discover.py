@@ -0,0 +1,62 @@
+"""
+List the lab scenes, their sections and the render cache state of each section.
+
+    python -m labs.common.discover [--quality draft] [-- manimgl flags]
+
+Everything is read from the module ASTs and the cache directory, so manim and
+OpenGL are never imported and the listing returns almost immediately. A section
+is "cached" when its chunk is on disk and "stale" when it must be rendered
+again. Every section of a scene is "unprobed" until the render driver has
+probed the current version of that scene.
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from labs.common.render import (
+    REPO_ROOT,
+    discover_scenes,
+    get_cache_dir,
+    get_probe_path,
+    get_static_keys,
+    hash_text,
+    parse_render_args,
+)
+
+
+def get_section_status(
+    module_path: Path, scene_name: str, manim_args: list[str], cache_root: Path
+) -> list[tuple[str, str]]:
+    """(section, 'cached' | 'stale' | 'unprobed') for every section of a scene"""
+    cache_dir = get_cache_dir(cache_root, module_path, scene_name)
+    static_keys = get_static_keys(module_path, scene_name, manim_args, cache_root)
+    probe_path = get_probe_path(static_keys, cache_dir)
+    if not probe_path.exists():
+        return [(name, "unprobed") for name, _ in static_keys]
+
+    entry_digests = json.loads(probe_path.read_text())["entry_digests"]
+    return [
+        (
+            name,
+            "cached"
+            if (cache_dir / f"{hash_text(key, entry_digests[name])}.mp4").exists()
+            else "stale",
+        )
+        for name, key in static_keys
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    args, manim_args = parse_render_args(parser)
+    for module_path, scene_name in discover_scenes(args.cache_dir):
+        print(f"{scene_name} ({module_path.relative_to(REPO_ROOT)})")
+        for name, status in get_section_status(
+            module_path, scene_name, manim_args, args.cache_dir
+        ):
+            print(f"  {status:<9}{name}")
+
+
+if __name__ == "__main__":
+    main()
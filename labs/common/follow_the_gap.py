@@ -0,0 +1,138 @@
+"""
+Follow the gap from Lab 2: lidar fans cast against obstacle outlines, the
+disparity extender and the three ways of picking a heading. Nothing here needs
+a scene, so the controllers shown in Lab2 can also be driven headlessly over
+thousands of layouts.
+"""
+
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+
+from labs.common.integrators import integrate_pose
+from labs.common.kernels import best_window, cast_fan
+from labs.common.scan import ScanConfig
+
+# Footprint of the car sprite in Lab2, the top view image scaled to 0.1
+CAR_LENGTH = 0.72
+CAR_WIDTH = 0.4
+
+
+def extend_disparities(
+    ranges: np.ndarray, threshold: float = 2.0, bubble_size: float = 0.3
+) -> np.ndarray:
+    """
+    Ranges with the near side of every disparity extended over the far side.
+
+    Wherever neighbouring beams differ by more than `threshold`, the beams on
+    the far side are clamped to the nearer range for as many beams as a bubble
+    of `bubble_size` covers at that range.
+    """
+    ranges = np.array(ranges, dtype=float)
+    disparities = np.where(abs(np.diff(ranges)) > threshold)[0]
+    for d in disparities:
+        if ranges[d] < ranges[d + 1]:
+            bubble_indices = int(bubble_size * len(ranges) / (ranges[d] * np.pi))
+            ranges[d + 1 : d + bubble_indices + 2] = ranges[d]
+        else:
+            bubble_indices = int(bubble_size * len(ranges) / (ranges[d + 1] * np.pi))
+            ranges[d - bubble_indices : d + 1] = ranges[d + 1]
+    return ranges
+
+
+@dataclass(frozen=True)
+class GapFollower:
+    """
+    Follow-the-gap controller with the options of a Lab2 scenario.
+
+    Args:
+        num_rays: beams spread evenly over the half circle ahead of the car
+        use_disparity_extender: extend disparities before picking a beam
+        window_approach: steer to the middle of the window of `window_size`
+            beams whose nearest range is largest, not to the farthest beam
+        max_range: range the lidar reports, and reads for beams that hit nothing
+    """
+
+    num_rays: int = 60
+    use_disparity_extender: bool = False
+    window_approach: bool = False
+    window_size: int = 13
+    max_range: float = 20.0
+
+    @cached_property
+    def scan(self) -> ScanConfig:
+        """Beams relative to the car's heading"""
+        return ScanConfig(
+            -np.pi / 2, np.pi / 2, self.num_rays, range_max=self.max_range
+        )
+
+    def get_angles(self, heading: float) -> np.ndarray:
+        return heading + self.scan.angles
+
+    def get_target_index(self, ranges: np.ndarray) -> int:
+        """Beam the car steers towards"""
+        if self.use_disparity_extender:
+            ranges = extend_disparities(ranges)
+        if self.window_approach:
+            return best_window(ranges, self.window_size) + self.window_size // 2
+        return int(np.argmax(ranges))
+
+
+def get_footprint(pose: np.ndarray) -> np.ndarray:
+    """(4, 2) corners of the car at [x, y, heading]"""
+    x, y, heading = pose
+    corners = np.array([[1, 1], [-1, 1], [-1, -1], [1, -1]]) * [
+        CAR_LENGTH / 2,
+        CAR_WIDTH / 2,
+    ]
+    rotation = np.array(
+        [[np.cos(heading), -np.sin(heading)], [np.sin(heading), np.cos(heading)]]
+    )
+    return corners @ rotation.T + [x, y]
+
+
+def simulate_follow_the_gap(
+    segments: np.ndarray,
+    is_blocked,
+    start: np.ndarray,
+    heading: float,
+    follower: GapFollower,
+    dt: float = 1 / 30,
+    duration: float = 10.0,
+    integrator: str = "semi_implicit_euler",
+) -> tuple[np.ndarray, bool]:
+    """
+    Drive one car headlessly the way Lab2.run_scenario does.
+
+    The car speeds up to 1 unit/s and turns a tenth of the way to the target
+    beam each tick, at most 2 rad/s, until any corner of its footprint is
+    blocked or `duration` runs out.
+
+    Args:
+        segments: (M, 2, 2) obstacle outlines the lidar sees
+        is_blocked: maps (N, 2) points to whether each is blocked
+
+    Returns:
+        (trajectory, crashed) with trajectory the (steps + 1, 3) poses
+    """
+    pose = np.array([start[0], start[1], heading], dtype=float)
+    trajectory = [pose]
+    speed = 0.0
+    for _ in range(round(duration / dt)):
+        if speed < 1:
+            speed += dt
+        angles = follower.get_angles(pose[2])
+        ranges = follower.scan.clean(cast_fan(pose[:2], angles, segments, np.inf))
+        target_angle = angles[follower.get_target_index(ranges)]
+        rotation = np.clip(0.1 * (target_angle - pose[2]), -2 * dt, 2 * dt)
+        pose = integrate_pose(pose, speed, rotation / dt, dt, integrator)
+        trajectory.append(pose)
+        if is_blocked(get_footprint(pose)).any():
+            return np.array(trajectory), True
+    return np.array(trajectory), False
+
+
+def get_distance(trajectory: np.ndarray) -> float:
+    """Length of the path driven along a (steps + 1, 3) trajectory"""
+    return float(np.linalg.norm(np.diff(trajectory[:, :2], axis=0), axis=-1).sum())
@@ -0,0 +1,100 @@
+"""
+Integrators for the unicycle car model used by the lab scenes.
+
+Poses are arrays shaped (..., 3) holding [x, y, heading]. Speed and turn rate
+are held constant over a step, and every integrator advances all poses at once.
+"""
+
+import numpy as np
+
+
+def unicycle(pose: np.ndarray, speed, omega) -> np.ndarray:
+    """Time derivative of [x, y, heading]"""
+    heading = pose[..., 2]
+    return np.stack(
+        [
+            speed * np.cos(heading),
+            speed * np.sin(heading),
+            np.broadcast_to(omega, heading.shape),
+        ],
+        axis=-1,
+    )
+
+
+def euler(pose: np.ndarray, speed, omega, dt: float) -> np.ndarray:
+    return pose + dt * unicycle(pose, speed, omega)
+
+
+def semi_implicit_euler(pose: np.ndarray, speed, omega, dt: float) -> np.ndarray:
+    """Turn first, then drive along the new heading"""
+    heading = pose[..., 2] + omega * dt
+    return np.stack(
+        [
+            pose[..., 0] + speed * np.cos(heading) * dt,
+            pose[..., 1] + speed * np.sin(heading) * dt,
+            heading,
+        ],
+        axis=-1,
+    )
+
+
+def rk4(pose: np.ndarray, speed, omega, dt: float) -> np.ndarray:
+    k1 = unicycle(pose, speed, omega)
+    k2 = unicycle(pose + dt / 2 * k1, speed, omega)
+    k3 = unicycle(pose + dt / 2 * k2, speed, omega)
+    k4 = unicycle(pose + dt * k3, speed, omega)
+    return pose + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+def adaptive(
+    pose: np.ndarray,
+    speed,
+    omega,
+    dt: float,
+    tolerance: float = 1e-6,
+    max_substeps: int = 64,
+) -> np.ndarray:
+    """
+    Bogacki-Shampine 3(2) with step size control.
+
+    The frame step is split into as many substeps as the error estimate asks
+    for, so a large dt from a low frame rate stays accurate.
+    """
+    elapsed = 0.0
+    h = dt
+    min_h = dt / max_substeps
+    while elapsed < dt:
+        h = min(h, dt - elapsed)
+        k1 = unicycle(pose, speed, omega)
+        k2 = unicycle(pose + h / 2 * k1, speed, omega)
+        k3 = unicycle(pose + 3 * h / 4 * k2, speed, omega)
+        third_order = pose + h * (2 / 9 * k1 + 1 / 3 * k2 + 4 / 9 * k3)
+        k4 = unicycle(third_order, speed, omega)
+        second_order = pose + h * (7 / 24 * k1 + 1 / 4 * k2 + 1 / 3 * k3 + 1 / 8 * k4)
+        error = np.max(np.abs(third_order - second_order), initial=0.0)
+
+        if error <= tolerance or h <= min_h:
+            pose = third_order
+            elapsed += h
+        scale = 5.0 if error == 0 else 0.9 * (tolerance / error) ** (1 / 3)
+        h = max(h * min(max(scale, 0.2), 5.0), min_h)
+    return pose
+
+
+INTEGRATORS = {
+    "euler": euler,
+    "semi_implicit_euler": semi_implicit_euler,
+    "rk4": rk4,
+    "adaptive": adaptive,
+}
+
+
+def integrate_pose(
+    pose: np.ndarray,
+    speed,
+    omega,
+    dt: float,
+    method: str = "semi_implicit_euler",
+) -> np.ndarray:
+    """Advance poses by dt with the named integrator"""
+    return INTEGRATORS[method](np.asarray(pose, dtype=float), speed, omega, dt)
@@ -0,0 +1,145 @@
+"""
+Hot loops of the lidar simulation, compiled with numba when it is installed.
+
+Each kernel has a NumPy reference and a plain-loop version that numba compiles.
+The loops repeat the reference arithmetic operation for operation, so both
+backends give identical results. Without numba, or with LAB_KERNELS=numpy, the
+references are used.
+
+    python -m labs.common.kernels  # time both backends on full 1081-beam scans
+"""
+
+import os
+
+import numpy as np
+
+from labs.common.profiling import time_call
+from labs.common.scan import ANGLE_MAX, ANGLE_MIN, MAX_RANGE, NUM_BEAMS
+from labs.common.wall_following import cast_rays, polyline_walls
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+KERNELS_ENV = "LAB_KERNELS"
+
+
+def cast_fan_reference(
+    origin: np.ndarray, angles: np.ndarray, segments: np.ndarray, max_range: float
+) -> np.ndarray:
+    return cast_rays(origin[None, :2], angles[None], segments, max_range)[0]
+
+
+def get_directions(angles: np.ndarray) -> np.ndarray:
+    """(K, 2) unit vectors, computed by NumPy exactly as cast_rays does"""
+    return np.stack([np.cos(angles), np.sin(angles)], axis=-1)
+
+
+def cast_fan_loops(
+    origin: np.ndarray, directions: np.ndarray, segments: np.ndarray, max_range: float
+) -> np.ndarray:
+    """cast_fan_reference with the beam directions from get_directions"""
+    ranges = np.empty(len(directions))
+    for i in range(len(directions)):
+        dx, dy = directions[i, 0], directions[i, 1]
+        nearest = np.inf
+        for j in range(len(segments)):
+            span_x = segments[j, 1, 0] - segments[j, 0, 0]
+            span_y = segments[j, 1, 1] - segments[j, 0, 1]
+            offset_x = segments[j, 0, 0] - origin[0]
+            offset_y = segments[j, 0, 1] - origin[1]
+            denominator = dx * span_y - dy * span_x
+            if denominator == 0:
+                continue
+            t = (offset_x * span_y - offset_y * span_x) / denominator
+            u = (offset_x * dy - offset_y * dx) / denominator
+            if t >= 0 and u >= 0 and u <= 1 and t < nearest:
+                nearest = t
+        ranges[i] = min(nearest, max_range)
+    return ranges
+
+
+def best_window_reference(ranges: np.ndarray, window_size: int) -> int:
+    windows = np.lib.stride_tricks.sliding_window_view(ranges, window_size)
+    return int(np.argmax(windows.min(axis=-1)))
+
+
+def best_window_loops(ranges: np.ndarray, window_size: int) -> int:
+    best_index = 0
+    best_min_distance = -np.inf
+    for i in range(len(ranges) - window_size + 1):
+        min_distance = ranges[i]
+        for j in range(i + 1, i + window_size):
+            min_distance = min(min_distance, ranges[j])
+        if min_distance > best_min_distance:
+            best_min_distance = min_distance
+            best_index = i
+    return best_index
+
+
+def compile_kernels():
+    """(cast_fan, best_window) compiled by numba, both taking reference arguments"""
+    compiled_cast_fan = numba.njit(cache=True)(cast_fan_loops)
+
+    def cast_fan(origin, angles, segments, max_range):
+        return compiled_cast_fan(origin, get_directions(angles), segments, max_range)
+
+    return cast_fan, numba.njit(cache=True)(best_window_loops)
+
+
+if numba is not None and os.environ.get(KERNELS_ENV) != "numpy":
+    BACKEND = "numba"
+    _cast_fan, _best_window = compile_kernels()
+else:
+    BACKEND = "numpy"
+    _cast_fan, _best_window = cast_fan_reference, best_window_reference
+
+
+def cast_fan(
+    origin: np.ndarray, angles: np.ndarray, segments: np.ndarray, max_range: float
+) -> np.ndarray:
+    """Range along each angle from `origin` to the nearest segment, at most max_range"""
+    return _cast_fan(
+        np.asarray(origin, dtype=float)[:2],
+        np.asarray(angles, dtype=float),
+        segments,
+        max_range,
+    )
+
+
+def best_window(ranges: np.ndarray, window_size: int) -> int:
+    """First beam of the window of `window_size` beams whose nearest range is largest"""
+    return int(_best_window(np.asarray(ranges, dtype=float), window_size))
+
+
+def main() -> None:
+    # A winding corridor with a few hundred wall segments, like a real track
+    x = np.linspace(-20, 20, 200)
+    centerline = np.stack([x, 3 * np.sin(x / 3)], axis=-1)
+    segments = polyline_walls(centerline + [0, 1.5], centerline - [0, 1.5])
+    origin = np.array([0.0, 0.0])
+    angles = np.linspace(ANGLE_MIN, ANGLE_MAX, NUM_BEAMS)
+    ranges = cast_fan_reference(origin, angles, segments, MAX_RANGE)
+    window_size = NUM_BEAMS // 20
+
+    backends = {"numpy": (cast_fan_reference, best_window_reference)}
+    if numba is not None:
+        backends["numba"] = compile_kernels()
+    print(f"{NUM_BEAMS} beams, {len(segments)} segments, window of {window_size}")
+    for name, (cast, window) in backends.items():
+        # First calls compile the numba kernels
+        assert np.array_equal(cast(origin, angles, segments, MAX_RANGE), ranges)
+        assert window(ranges, window_size) == best_window_reference(ranges, window_size)
+        cast_time = time_call(cast, origin, angles, segments, MAX_RANGE)
+        window_time = time_call(window, ranges, window_size)
+        print(
+            f"{name:<8}cast {cast_time * 1e3:8.3f} ms"
+            f"   window {window_time * 1e6:8.1f} us"
+        )
+    if numba is None:
+        print("numba is not installed, only the NumPy reference was timed")
+
+
+if __name__ == "__main__":
+    main()
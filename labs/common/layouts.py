@@ -0,0 +1,181 @@
+"""
+Seeded random layouts for follow the gap: obstacle courses and closed tracks.
+
+A layout is compiled straight from polylines into PolygonObstacles, so it is
+generated without manimlib, pickles cheaply and the same seed always gives the
+same layout.
+
+Obstacle courses are circles and rectangles inside a box. A random corridor
+runs from the car's start to the far side of the box and no obstacle is placed
+within reach of it, so every course can be driven through. Tracks are annuli
+whose centerline radius and width vary with low-order harmonics, giving
+straights, corners and pinches of different strength.
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import numpy as np
+
+from labs.common.obstacles import ObstacleType, PolygonObstacles
+
+
+@dataclass
+class Layout:
+    """Compiled walls of a generated layout and where the car starts"""
+
+    kind: str
+    seed: int
+    obstacles: PolygonObstacles
+    start: np.ndarray
+    heading: float
+
+
+def circle_polyline(center, radius: float, samples: int = 32) -> np.ndarray:
+    angles = np.linspace(0, 2 * np.pi, samples + 1)
+    return center + radius * np.stack([np.cos(angles), np.sin(angles)], axis=-1)
+
+
+def rectangle_polyline(
+    center, width: float, height: float, angle: float = 0.0
+) -> np.ndarray:
+    corners = np.array([[1, 1], [-1, 1], [-1, -1], [1, -1], [1, 1]]) * [
+        width / 2,
+        height / 2,
+    ]
+    rotation = np.array(
+        [[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]]
+    )
+    return corners @ rotation.T + center
+
+
+def get_polyline_distance(point: np.ndarray, polyline: np.ndarray) -> float:
+    """Distance from `point` to the nearest point of the open polyline"""
+    starts, ends = polyline[:-1], polyline[1:]
+    spans = ends - starts
+    t = np.clip(
+        np.einsum("ij,ij->i", point - starts, spans)
+        / np.einsum("ij,ij->i", spans, spans),
+        0,
+        1,
+    )
+    return float(np.linalg.norm(starts + t[:, None] * spans - point, axis=-1).min())
+
+
+def random_obstacle_course(
+    rng: np.random.Generator,
+    width: float = 12.0,
+    height: float = 6.0,
+    num_obstacles: tuple[int, int] = (3, 8),
+    corridor_width: float = 1.2,
+    num_waypoints: int = 5,
+    max_attempts: int = 200,
+) -> tuple[list, np.ndarray, float]:
+    """
+    Circles and rectangles in a box around a corridor that is kept clear.
+
+    Args:
+        num_obstacles: fewest and most obstacles to place
+        corridor_width: width of the clear corridor, which is wider than the car
+        num_waypoints: corners of the corridor, evenly spaced across the box
+
+    Returns:
+        (obstacles, start, heading) for a Layout
+    """
+    margin = corridor_width / 2 + 0.2
+    corridor = np.stack(
+        [
+            np.linspace(-width / 2 + 1, width / 2 - 1, num_waypoints),
+            rng.uniform(-height / 2 + margin, height / 2 - margin, num_waypoints),
+        ],
+        axis=-1,
+    )
+    obstacles = [
+        ([rectangle_polyline([0, 0], width, height)], ObstacleType.NEGATIVE_SPACE)
+    ]
+    target = rng.integers(num_obstacles[0], num_obstacles[1] + 1)
+    for _ in range(max_attempts):
+        if len(obstacles) > target:
+            break
+        center = rng.uniform([-width / 2, -height / 2], [width / 2, height / 2])
+        if rng.random() < 0.5:
+            radius = rng.uniform(0.3, 1.2)
+            outline = circle_polyline(center, radius)
+        else:
+            sides = rng.uniform(0.4, 2.0, 2)
+            radius = np.linalg.norm(sides) / 2
+            outline = rectangle_polyline(center, *sides, rng.uniform(0, np.pi))
+        if get_polyline_distance(center, corridor) > radius + corridor_width / 2:
+            obstacles.append(([outline], ObstacleType.POSITIVE_SPACE))
+    heading = np.arctan2(*(corridor[1] - corridor[0])[::-1])
+    return obstacles, corridor[0], float(heading)
+
+
+def random_track(
+    rng: np.random.Generator,
+    radius: float = 3.0,
+    half_width: tuple[float, float] = (0.6, 1.0),
+    curvature: float = 0.15,
+    width_variation: float = 0.4,
+    samples: int = 128,
+) -> tuple[list, np.ndarray, float]:
+    """
+    Closed track between two walls at varying distances from a wavy centerline.
+
+    Both walls are radial offsets of the centerline and stay at a positive
+    radius, so they never cross themselves or each other.
+
+    Args:
+        radius: mean radius of the centerline
+        half_width: range of the mean half width of the track
+        curvature: amplitude of the 2nd to 4th harmonics of the centerline
+            radius, relative to `radius`, which sets how tight the corners are
+        width_variation: how much the half width swings around its mean
+        samples: points per wall
+
+    Returns:
+        (obstacles, start, heading) for a Layout, driving counterclockwise
+    """
+    harmonics = np.arange(2, 5)
+    amplitudes = rng.uniform(-curvature, curvature, len(harmonics)) / harmonics
+    phases = rng.uniform(0, 2 * np.pi, len(harmonics))
+    mean_half_width = rng.uniform(*half_width)
+    width_harmonic = rng.integers(1, 4)
+    width_amplitude = rng.uniform(0, width_variation)
+    width_phase = rng.uniform(0, 2 * np.pi)
+    stretch = rng.uniform(0.7, 1.3)
+
+    def get_wall(angles: np.ndarray, offset: float) -> np.ndarray:
+        centerline = radius * (
+            1 + (amplitudes * np.cos(np.outer(angles, harmonics) + phases)).sum(-1)
+        )
+        widths = mean_half_width * (
+            1 + width_amplitude * np.cos(width_harmonic * angles + width_phase)
+        )
+        radii = centerline + offset * widths
+        return np.stack(
+            [stretch * radii * np.cos(angles), radii * np.sin(angles)], axis=-1
+        )
+
+    angles = np.linspace(0, 2 * np.pi, samples + 1)
+    obstacles = [
+        ([get_wall(angles, -1)], ObstacleType.POSITIVE_SPACE),
+        ([get_wall(angles, 1)], ObstacleType.NEGATIVE_SPACE),
+    ]
+    start, ahead = get_wall(np.array([0.0, 1e-3]), 0)
+    heading = np.arctan2(*(ahead - start)[::-1])
+    return obstacles, start, float(heading)
+
+
+LAYOUT_KINDS: dict[str, Callable] = {
+    "course": random_obstacle_course,
+    "track": random_track,
+}
+
+
+def generate_layout(kind: str, seed: int, **kwargs) -> Layout:
+    """The layout of `kind` for `seed`, with generator options as keywords"""
+    obstacles, start, heading = LAYOUT_KINDS[kind](
+        np.random.default_rng(seed), **kwargs
+    )
+    return Layout(kind, seed, PolygonObstacles(*obstacles), start, heading)
@@ -0,0 +1,100 @@
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class PID:
+    kp: float = 0.0
+    ki: float = 0.0
+    kd: float = 0.0
+    setpoint: float = 0.0
+    out_limits: Tuple[Optional[float], Optional[float]] = (-1.0, 1.0)
+    integral: float = 0.0
+    previous_error: Optional[float] = None
+
+    def reset(self) -> None:
+        self.integral = 0.0
+        self.previous_error = None
+
+    def update(
+        self, measurement: float, dt: Optional[float]
+    ) -> Tuple[float, float, float, float]:
+        error: float = self.setpoint - measurement
+        if dt and dt > 0.0:
+            self.integral += error * dt
+        derivative: float = (
+            (error - self.previous_error) / dt
+            if dt and dt > 0.0 and self.previous_error is not None
+            else 0.0
+        )
+        u: float = self.kp * error + self.ki * self.integral + self.kd * derivative
+        low, high = self.out_limits
+        if low is not None and u < low:
+            u = low
+        if high is not None and u > high:
+            u = high
+        self.previous_error = error
+        return u, self.kp * error, self.ki * self.integral, self.kd * derivative
+
+
+@dataclass
+class BatchPID:
+    """
+    N PID controllers stepped together, with gains and state held in arrays.
+
+    Performs the arithmetic of PID.update for every controller at once.
+    Controllers that have no previous error yet hold NaN in `previous_error`.
+    """
+
+    kp: np.ndarray
+    ki: np.ndarray
+    kd: np.ndarray
+    setpoint: np.ndarray
+    low: np.ndarray
+    high: np.ndarray
+    integral: np.ndarray
+    previous_error: np.ndarray
+
+    @classmethod
+    def from_pids(cls, pids: List[PID]) -> "BatchPID":
+        def limits(index: int, default: float) -> np.ndarray:
+            return np.array(
+                [
+                    default if pid.out_limits[index] is None else pid.out_limits[index]
+                    for pid in pids
+                ],
+                dtype=float,
+            )
+
+        return cls(
+            kp=np.array([pid.kp for pid in pids], dtype=float),
+            ki=np.array([pid.ki for pid in pids], dtype=float),
+            kd=np.array([pid.kd for pid in pids], dtype=float),
+            setpoint=np.array([pid.setpoint for pid in pids], dtype=float),
+            low=limits(0, -np.inf),
+            high=limits(1, np.inf),
+            integral=np.array([pid.integral for pid in pids], dtype=float),
+            previous_error=np.array(
+                [
+                    np.nan if pid.previous_error is None else pid.previous_error
+                    for pid in pids
+                ],
+                dtype=float,
+            ),
+        )
+
+    def update(self, measurements: np.ndarray, dt: Optional[float]) -> np.ndarray:
+        """Clipped control outputs, shaped like `measurements`"""
+        error = self.setpoint - measurements
+        if dt and dt > 0.0:
+            self.integral = self.integral + error * dt
+            derivative = np.where(
+                np.isnan(self.previous_error), 0.0, (error - self.previous_error) / dt
+            )
+        else:
+            derivative = np.zeros_like(error)
+        u = self.kp * error + self.ki * self.integral + self.kd * derivative
+        self.previous_error = error
+        return np.clip(u, self.low, self.high)
@@ -0,0 +1,38 @@
+from manimlib import Axes, VGroup, VMobject
+
+
+class PlotTraces(VGroup):
+    """
+    Live plot traces for one section, kept as a single mobject.
+
+    Each tracked series is one growing polyline instead of a Line per sample, so
+    the whole plot is added, faded out and released in one go.
+
+    Args:
+        axes: axes the samples are plotted against
+        keys: names of the series to record, other keys are ignored
+    """
+
+    def __init__(self, axes: Axes, keys: list[str], **kwargs):
+        super().__init__(**kwargs)
+        self.axes = axes
+        self.keys = set(keys)
+        self.series: dict[str, VMobject] = {}
+
+    def add_sample(self, key: str, x: float, y: float, color: str) -> None:
+        if key not in self.keys:
+            return
+        point = self.axes.coords_to_point(x, y)
+        if key not in self.series:
+            self.series[key] = VMobject(stroke_color=color, stroke_width=2)
+            self.series[key].start_new_path(point)
+            self.add(self.series[key])
+        else:
+            self.series[key].add_line_to(point)
+
+    def release(self) -> None:
+        """Drop all recorded points once the section is done with the plot"""
+        for trace in self.series.values():
+            trace.clear_points()
+        self.series.clear()
+        self.clear()
@@ -0,0 +1,172 @@
+"""
+Opt-in timing of scene renders.
+
+With LAB_PROFILE=<path> set, a SectionedScene times every frame, every updater
+and every wait_until condition, tagged with the section it ran in. When the
+scene ends a summary is printed and saved next to <path>, and <path> itself
+gets a Chrome trace that chrome://tracing or https://ui.perfetto.dev can open.
+"""
+
+import json
+import time
+import timeit
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+PROFILE_ENV = "LAB_PROFILE"
+
+
+class Profiler:
+    """Records timed spans as (name, category, section, start, duration, args)"""
+
+    def __init__(self):
+        self.section = ""
+        self.events = []
+        self.origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, category: str, **args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.events.append(
+                (
+                    name,
+                    category,
+                    self.section,
+                    start - self.origin,
+                    time.perf_counter() - start,
+                    args,
+                )
+            )
+
+    def wrap(self, func, name: str, category: str):
+        """`func` with every call recorded as a span"""
+
+        def timed(*args, **kwargs):
+            with self.span(name, category):
+                return func(*args, **kwargs)
+
+        return timed
+
+    def get_durations(self, category: str) -> dict[str, np.ndarray]:
+        durations = {}
+        for name, event_category, _, _, duration, _ in self.events:
+            if event_category == category:
+                durations.setdefault(name, []).append(duration)
+        return {name: np.array(values) for name, values in durations.items()}
+
+    def get_summary(self, worst_count: int = 10) -> str:
+        """Totals and percentiles per span name, per-section frames, worst frames"""
+        lines = [
+            f"{'span':<48}{'calls':>8}{'total s':>10}"
+            f"{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"
+        ]
+        for category in ("frame", "write", "updater", "condition"):
+            for name, durations in sorted(
+                self.get_durations(category).items(), key=lambda item: -item[1].sum()
+            ):
+                p50, p95 = np.percentile(durations, [50, 95]) * 1000
+                lines.append(
+                    f"{f'{category}: {name}':<48}{len(durations):>8}"
+                    f"{durations.sum():>10.2f}{durations.mean() * 1000:>10.2f}"
+                    f"{p50:>10.2f}{p95:>10.2f}{durations.max() * 1000:>10.2f}"
+                )
+
+        frames = [event for event in self.events if event[0] == "update_frame"]
+        lines += ["", f"{'section':<48}{'frames':>8}{'total s':>10}{'p95 ms':>10}"]
+        sections = {}
+        for _, _, section, _, duration, _ in frames:
+            sections.setdefault(section, []).append(duration)
+        for section, durations in sections.items():
+            lines.append(
+                f"{section:<48}{len(durations):>8}{sum(durations):>10.2f}"
+                f"{np.percentile(durations, 95) * 1000:>10.2f}"
+            )
+
+        lines += ["", f"{'worst frames':<48}{'time s':>8}{'ms':>10}"]
+        for _, _, section, _, duration, args in sorted(frames, key=lambda e: -e[4])[
+            :worst_count
+        ]:
+            lines.append(
+                f"{section:<48}{args.get('time', 0):>8.2f}{duration * 1000:>10.2f}"
+            )
+        return "\n".join(lines)
+
+    def write_trace(self, path: Path) -> None:
+        """Save the spans in the Chrome trace event format"""
+        trace_events = [
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": duration * 1e6,
+                "pid": 0,
+                "tid": 0,
+                "args": {"section": section, **args},
+            }
+            for name, category, section, start, duration, args in self.events
+        ]
+        path.write_text(json.dumps({"traceEvents": trace_events}))
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        summary = self.get_summary()
+        print(summary)
+        path.with_suffix(".txt").write_text(summary + "\n")
+        self.write_trace(path)
+
+
+class TimedUpdater:
+    """
+    Stands in for an updater in `Mobject.updaters`, timing each call.
+
+    It compares and hashes equal to the updater it wraps, so remove_updater and
+    `updater in mob.updaters` keep working, and it exposes the wrapped
+    `__code__` so manimgl still decides whether to pass dt.
+    """
+
+    def __init__(self, updater, profiler: Profiler):
+        self.updater = updater
+        self.profiler = profiler
+        self.__code__ = updater.__code__
+        self.name = getattr(updater, "__qualname__", repr(updater)).replace(
+            ".<locals>", ""
+        )
+
+    def __call__(self, *args, **kwargs):
+        with self.profiler.span(self.name, "updater"):
+            return self.updater(*args, **kwargs)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TimedUpdater):
+            other = other.updater
+        return self.updater == other
+
+    def __hash__(self) -> int:
+        return hash(self.updater)
+
+
+def time_updaters(mobjects, profiler: Profiler) -> None:
+    """Swap every updater in the families of `mobjects` for a TimedUpdater"""
+    for mobject in mobjects:
+        for member in mobject.get_family():
+            if all(isinstance(updater, TimedUpdater) for updater in member.updaters):
+                continue
+            member.updaters = [
+                updater
+                if isinstance(updater, TimedUpdater)
+                else TimedUpdater(updater, profiler)
+                for updater in member.updaters
+            ]
+
+
+def time_call(func, *args, repeat: int = 5) -> float:
+    """Best seconds per call of func(*args) over `repeat` autoranged runs"""
+    timer = timeit.Timer(lambda: func(*args))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
@@ -0,0 +1,59 @@
+"""
+Quality profiles that scale how much detail the lab scenes draw.
+
+A draft only changes what is drawn: the lidar simulations draw fewer of their
+rays, the live plots record fewer samples and Riemann sums use wider
+rectangles. Every simulation computes exactly what it does at final quality, so
+sections keep their length and their content. Pick a profile with
+LAB_QUALITY=draft or with the `default_quality` attribute of a scene.
+
+There is no simulation knob to turn down: every beam is cast exactly against
+the obstacle outlines, and a Lab2 control tick costs well under a millisecond.
+A draft is faster because each frame has fewer mobjects to shade, and because
+the render driver also drops drafts to manimgl's 480p.
+"""
+
+import os
+from dataclasses import dataclass
+
+QUALITY_ENV = "LAB_QUALITY"
+
+
+@dataclass(frozen=True)
+class QualityProfile:
+    """
+    Args:
+        name: name used to select the profile
+        ray_fraction: share of the lidar rays each simulation draws
+        plot_interval: seconds between plotted samples, 0 plots every frame
+        riemann_dx_scale: factor on the width of Riemann rectangles
+    """
+
+    name: str
+    ray_fraction: float = 1.0
+    plot_interval: float = 0.0
+    riemann_dx_scale: float = 1.0
+
+    def get_ray_count(self, count: int) -> int:
+        """Number of rays to draw where the full-quality scene draws `count`"""
+        return max(3, round(count * self.ray_fraction))
+
+
+FINAL = QualityProfile("final")
+DRAFT = QualityProfile(
+    "draft",
+    ray_fraction=0.5,
+    plot_interval=0.1,
+    riemann_dx_scale=2.0,
+)
+QUALITY_PROFILES = {profile.name: profile for profile in (DRAFT, FINAL)}
+
+
+def get_quality(default: str = "final") -> QualityProfile:
+    """Profile named by LAB_QUALITY, falling back to `default`"""
+    name = os.environ.get(QUALITY_ENV, default)
+    if name not in QUALITY_PROFILES:
+        raise ValueError(
+            f"Unknown quality {name!r}, expected one of {list(QUALITY_PROFILES)}"
+        )
+    return QUALITY_PROFILES[name]
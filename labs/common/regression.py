@@ -0,0 +1,211 @@
+"""
+Frame-level regression checks for the lab sections.
+
+    python -m labs.common.regression                   # every section of every lab
+    python -m labs.common.regression Lab2 Lab1.wall_following_simulation
+    python -m labs.common.regression Lab2 --update     # accept the current output
+
+Each section is rendered on its own at final quality, a small resolution and a
+fixed frame rate, so every simulation steps with the same dt. The scenes seed
+their random draws and the code slides show the timings frozen in
+baselines/benchmarks by the first run that measured them, so a section renders
+the same frames every time on one machine. Other GPUs and drivers may still
+shade a few pixels differently. The decoded frames are hashed and also shrunk
+to grayscale thumbnails. A section passes when every frame hash matches its
+baseline, or when the frame counts match and no thumbnail drifts more than the
+tolerance, which absorbs such differences.
+
+Baselines live in baselines/<Scene>/<section>.npz and are not generated
+automatically. A section without one fails. To start, or after an intended
+change, render the sections to accept with --update, check the videos and
+commit baselines/, benchmark timings included. Delete a timing to measure it
+again.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from labs.common.benchmark import BENCHMARK_ENV
+from labs.common.quality import QUALITY_ENV
+from labs.common.render import (
+    REPO_ROOT,
+    SECTION_ENV,
+    discover_scenes,
+    get_manim_command,
+    read_sections,
+    run_manim,
+)
+
+BASELINE_DIR = REPO_ROOT / "baselines"
+BENCHMARK_DIR = BASELINE_DIR / "benchmarks"
+RESOLUTION = "426x240"
+FPS = 30
+THUMBNAIL_SIZE = (32, 18)
+
+
+def get_frames(video_path: Path) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Per-frame MD5s of the decoded video and small grayscale thumbnails.
+
+    Returns:
+        (hashes, thumbnails) shaped (frames,) and (frames, height, width)
+    """
+    framemd5 = subprocess.run(
+        ["ffmpeg", "-loglevel", "error", "-i", str(video_path), "-f", "framemd5", "-"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    hashes = [line.split(",")[-1].strip() for line in framemd5.splitlines()]
+    hashes = [value for value in hashes if value and not value.startswith("#")]
+
+    width, height = THUMBNAIL_SIZE
+    raw = subprocess.run(
+        [
+            "ffmpeg",
+            "-loglevel",
+            "error",
+            "-i",
+            str(video_path),
+            "-vf",
+            f"scale={width}:{height},format=gray",
+            "-f",
+            "rawvideo",
+            "-",
+        ],
+        capture_output=True,
+        check=True,
+    ).stdout
+    thumbnails = np.frombuffer(raw, dtype=np.uint8).reshape(-1, height, width)
+    return np.array(hashes), thumbnails
+
+
+def render_frames(
+    module_path: Path, scene_name: str, section_name: str
+) -> tuple[np.ndarray, np.ndarray]:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        command = get_manim_command(
+            module_path,
+            scene_name,
+            section_name,
+            Path(temp_dir),
+            ["-w", "-r", RESOLUTION, "--fps", str(FPS)],
+        )
+        env = {
+            **os.environ,
+            SECTION_ENV: section_name,
+            QUALITY_ENV: "final",
+            # Fresh timings would change the frames on every run
+            BENCHMARK_ENV: str(BENCHMARK_DIR),
+        }
+        run_manim(command, env)
+        return get_frames(Path(temp_dir, f"{section_name}.mp4"))
+
+
+def compare(
+    hashes: np.ndarray,
+    thumbnails: np.ndarray,
+    baseline_path: Path,
+    tolerance: float,
+) -> str:
+    """'identical', 'close' or a description of how the frames differ"""
+    if not baseline_path.exists():
+        return "no baseline"
+    baseline = np.load(baseline_path)
+    if len(hashes) != len(baseline["hashes"]):
+        return f"{len(hashes)} frames, baseline has {len(baseline['hashes'])}"
+    if np.array_equal(hashes, baseline["hashes"]):
+        return "identical"
+
+    drift = np.abs(
+        thumbnails.astype(float) - baseline["thumbnails"].astype(float)
+    ).mean(axis=(1, 2))
+    if drift.max() <= tolerance:
+        return "close"
+    frame = int(np.argmax(drift > tolerance))
+    return f"frame {frame} ({frame / FPS:.2f}s) drifts by {drift[frame]:.1f}"
+
+
+def check_section(
+    module_path: Path,
+    scene_name: str,
+    section_name: str,
+    update: bool,
+    tolerance: float,
+) -> tuple[str, bool]:
+    hashes, thumbnails = render_frames(module_path, scene_name, section_name)
+    baseline_path = BASELINE_DIR / scene_name / f"{section_name}.npz"
+    if update:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(baseline_path, hashes=hashes, thumbnails=thumbnails)
+        return "updated", True
+    result = compare(hashes, thumbnails, baseline_path, tolerance)
+    return result, result in ("identical", "close")
+
+
+def get_targets(selectors: list[str]) -> list[tuple[Path, str, str]]:
+    """(module, scene, section) for selectors like 'Lab2' or 'Lab2.outline'"""
+    targets = []
+    for module_path, scene_name in discover_scenes():
+        sections, _ = read_sections(module_path, scene_name)
+        for section_name, _ in sections:
+            if not selectors or any(
+                selector in (scene_name, f"{scene_name}.{section_name}")
+                for selector in selectors
+            ):
+                targets.append((module_path, scene_name, section_name))
+    return targets
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "selectors", nargs="*", help="Scene or Scene.section, everything if omitted"
+    )
+    parser.add_argument("--update", action="store_true", help="rewrite the baselines")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=2.0,
+        help="largest mean thumbnail difference per frame, out of 255",
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    targets = get_targets(args.selectors)
+    if not targets:
+        parser.error(f"no sections match {args.selectors}")
+
+    with ThreadPoolExecutor(args.jobs) as pool:
+        results = pool.map(
+            lambda target: check_section(*target, args.update, args.tolerance),
+            targets,
+        )
+        failures = 0
+        missing = 0
+        for (_, scene_name, section_name), (result, passed) in zip(
+            targets, results, strict=True
+        ):
+            failures += not passed
+            missing += result == "no baseline"
+            print(
+                f"{'ok  ' if passed else 'FAIL'} {scene_name}.{section_name}: {result}"
+            )
+    if missing:
+        print(
+            f"{missing} sections have no baseline, record them with --update "
+            "and commit baselines/",
+            file=sys.stderr,
+        )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
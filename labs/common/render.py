@@ -0,0 +1,536 @@
+"""
+Render a sectioned lab scene through an on-disk cache of per-section chunks.
+
+    python -m labs.common.render labs/lab2/lab2.py Lab2 [-- manimgl flags]
+    python -m labs.common.render [-- manimgl flags]  # every lab
+
+Every section is fingerprinted from its own source, the rest of the module, the
+shared labs.common code, the assets the module references, the manimgl flags,
+the quality profile and a digest of the scene state entering it. The digests
+come from a probe run that replays the scene with animations skipped, which
+also dry-runs every wait_until simulation and so knows the length of every
+section up front, and checkpoints the scene state entering every section. The
+LaTeX of every scene is compiled up front, then only sections without a cached
+chunk are rendered, longest first, each in its own manimgl process and several
+at once, resuming from the checkpoint of its entry state. Finally all chunks
+are concatenated without re-encoding.
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import cache
+from importlib import metadata
+from pathlib import Path
+
+from labs.common.benchmark import BENCHMARK_ENV
+from labs.common.quality import QUALITY_ENV, QUALITY_PROFILES, get_quality
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+CACHE_DIR = REPO_ROOT / ".render_cache"
+SECTION_ENV = "LAB_SECTION"
+PROBE_ENV = "LAB_PROBE"
+SCHEDULE_ENV = "LAB_SCHEDULE"
+CHECKPOINT_ENV = "LAB_CHECKPOINTS"
+
+
+def hash_text(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@cache
+def parse_module(module_path: Path) -> ast.Module:
+    return ast.parse(module_path.read_text())
+
+
+def load_or_compute(kind: str, key: str, compute, cache_root: Path = CACHE_DIR):
+    """
+    JSON result of compute(), memoized under <cache_root>/<kind>/<key>.json.
+
+    Keys are hashes of raw source text, so unchanged modules skip the AST work
+    and tools that only need the fingerprints start quickly.
+    """
+    path = cache_root / kind / f"{key}.json"
+    if path.exists():
+        return json.loads(path.read_text())
+    result = compute()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Worker threads read and write these at once, so write to a temporary file
+    # and rename it into place to never expose a partial file
+    with tempfile.NamedTemporaryFile("w", dir=path.parent, delete=False) as file:
+        json.dump(result, file)
+    os.replace(file.name, path)
+    return result
+
+
+def discover_scenes(cache_root: Path = CACHE_DIR) -> list[tuple[Path, str]]:
+    """(module, class) of every SectionedScene under labs/, found from the AST"""
+    scenes = []
+    for module_path in sorted(REPO_ROOT.glob("labs/*/*.py")):
+        if module_path.parent.name == "common":
+            continue
+
+        def compute(module_path: Path = module_path):
+            return [
+                node.name
+                for node in parse_module(module_path).body
+                if isinstance(node, ast.ClassDef)
+                and any(
+                    isinstance(base, ast.Name) and base.id == "SectionedScene"
+                    for base in node.bases
+                )
+            ]
+
+        key = hash_text(module_path.read_text())
+        scenes += [
+            (module_path, name)
+            for name in load_or_compute("scenes", key, compute, cache_root)
+        ]
+    return scenes
+
+
+def is_section(node: ast.AST) -> bool:
+    return isinstance(node, ast.FunctionDef) and any(
+        (isinstance(decorator, ast.Name) and decorator.id == "section")
+        or (isinstance(decorator, ast.Attribute) and decorator.attr == "section")
+        for decorator in node.decorator_list
+    )
+
+
+def read_sections(
+    module_path: Path, scene_name: str
+) -> tuple[list[tuple[str, str]], str]:
+    """
+    Split a scene module into its sections and everything the sections share.
+
+    Sources are compared as ASTs, so comments and formatting don't count.
+
+    Returns:
+        ([(section name, section ast), ...], ast of the rest of the module)
+    """
+    tree = parse_module(module_path)
+    scenes = [
+        node
+        for node in tree.body
+        if isinstance(node, ast.ClassDef) and node.name == scene_name
+    ]
+    if not scenes:
+        raise SystemExit(f"No scene named {scene_name} in {module_path}")
+    scene = scenes[0]
+
+    sections = [(node.name, ast.dump(node)) for node in scene.body if is_section(node)]
+    shared = [ast.dump(node) for node in tree.body if node is not scene]
+    shared += [ast.dump(base) for base in scene.bases]
+    shared += [ast.dump(node) for node in scene.body if not is_section(node)]
+    return sections, "\n".join(shared)
+
+
+def get_section_hashes(
+    module_path: Path, scene_name: str, cache_root: Path = CACHE_DIR
+) -> tuple[list[tuple[str, str]], str]:
+    """Hashes of the section ASTs and of the shared AST from read_sections"""
+
+    def compute():
+        sections, shared = read_sections(module_path, scene_name)
+        return [[name, hash_text(source)] for name, source in sections], hash_text(
+            shared
+        )
+
+    key = hash_text(module_path.read_text(), scene_name)
+    sections, shared = load_or_compute("ast", key, compute, cache_root)
+    return [tuple(section) for section in sections], shared
+
+
+@cache
+def get_shared_code_hash(cache_root: Path = CACHE_DIR) -> str:
+    """Hash of the labs.common package every scene builds on"""
+    paths = sorted(Path(__file__).parent.glob("*.py"))
+
+    def compute():
+        return hash_text(
+            *(f"{path.name}\n{ast.dump(parse_module(path))}" for path in paths)
+        )
+
+    key = hash_text(*(f"{path.name}\n{path.read_text()}" for path in paths))
+    return load_or_compute("ast", key, compute, cache_root)
+
+
+def get_asset_paths(module_path: Path, cache_root: Path = CACHE_DIR) -> list[str]:
+    """Every existing file the module names in a string literal"""
+
+    def compute():
+        return sorted(
+            {
+                node.value
+                for node in ast.walk(parse_module(module_path))
+                if isinstance(node, ast.Constant)
+                and isinstance(node.value, str)
+                and len(node.value) < 256
+                and (REPO_ROOT / node.value).is_file()
+            }
+        )
+
+    key = hash_text(module_path.read_text())
+    return load_or_compute("assets", key, compute, cache_root)
+
+
+def get_asset_hash(module_path: Path, cache_root: Path = CACHE_DIR) -> str:
+    """Hash of the names and contents of the files the module refers to"""
+    digest = hashlib.sha256()
+    for asset in get_asset_paths(module_path, cache_root):
+        digest.update(asset.encode())
+        digest.update(hashlib.sha256((REPO_ROOT / asset).read_bytes()).digest())
+    return digest.hexdigest()
+
+
+@cache
+def get_manim_version() -> str:
+    try:
+        return metadata.version("manimgl")
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+def get_static_keys(
+    module_path: Path,
+    scene_name: str,
+    manim_args: list[str],
+    cache_root: Path = CACHE_DIR,
+) -> list[tuple[str, str]]:
+    """Fingerprint of each section without the scene state entering it"""
+    sections, shared = get_section_hashes(module_path, scene_name, cache_root)
+    common = hash_text(
+        shared,
+        get_shared_code_hash(cache_root),
+        get_asset_hash(module_path, cache_root),
+        json.dumps(manim_args),
+        get_quality().name,
+        get_manim_version(),
+    )
+    return [(name, hash_text(common, source)) for name, source in sections]
+
+
+def get_manim_command(
+    module_path: Path, scene_name: str, file_name: str, video_dir: Path, args: list[str]
+) -> list[str]:
+    return [
+        sys.executable,
+        "-m",
+        "manimlib",
+        str(module_path.relative_to(REPO_ROOT)),
+        scene_name,
+        "--file_name",
+        file_name,
+        "--video_dir",
+        str(video_dir),
+        *args,
+    ]
+
+
+def run_manim(command: list[str], env: dict[str, str]) -> None:
+    """Run manimgl quietly, showing its output only if it fails"""
+    result = subprocess.run(
+        command, cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=False
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stdout + result.stderr)
+        raise subprocess.CalledProcessError(result.returncode, command)
+
+
+def get_cache_dir(cache_root: Path, module_path: Path, scene_name: str) -> Path:
+    return cache_root / module_path.stem / scene_name
+
+
+def get_probe_path(static_keys: list[tuple[str, str]], cache_dir: Path) -> Path:
+    return cache_dir / f"probe-{hash_text(*(key for _, key in static_keys))}.json"
+
+
+def get_checkpoint_manifest(probe_path: Path) -> Path:
+    """Checkpoint path of every section, for the code version of the probe"""
+    return probe_path.with_name(probe_path.name.replace("probe-", "checkpoints-", 1))
+
+
+def get_benchmark_dir(probe_path: Path) -> Path:
+    """Frozen benchmark timings, for the code version of the probe"""
+    return probe_path.with_name(probe_path.stem.replace("probe-", "benchmarks-", 1))
+
+
+def write_checkpoint_manifest(
+    static_keys: list[tuple[str, str]], probe_path: Path
+) -> Path:
+    """
+    Map every section after the first to the checkpoint of its entry state.
+
+    The state entering a section only depends on the sections before it and
+    on what all sections share, which their static keys cover. Each checkpoint
+    is named by the keys of those sections, so an edit keeps the checkpoints of
+    every section up to the edited one.
+    """
+    manifest_path = get_checkpoint_manifest(probe_path)
+    if not manifest_path.exists():
+        keys = [key for _, key in static_keys]
+        checkpoint_dir = probe_path.parent / "checkpoints"
+        manifest = {
+            name: str(checkpoint_dir / f"{hash_text(*keys[:index])}.pkl")
+            for index, (name, _) in enumerate(static_keys)
+            if index > 0
+        }
+        manifest_path.write_text(json.dumps(manifest, indent=2))
+    return manifest_path
+
+
+def probe_scene(
+    module_path: Path,
+    scene_name: str,
+    static_keys: list[tuple[str, str]],
+    manim_args: list[str],
+    cache_dir: Path,
+) -> Path:
+    """
+    Probe the scene once per code version and return the probe path.
+
+    The probe holds the digest of the scene state entering each section, the
+    length of each section in seconds and the frame count of each wait_until.
+    """
+    probe_path = get_probe_path(static_keys, cache_dir)
+    manifest_path = write_checkpoint_manifest(static_keys, probe_path)
+    if not probe_path.exists():
+        print(f"{scene_name}: probing sections")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            command = get_manim_command(
+                module_path,
+                scene_name,
+                "probe",
+                Path(temp_dir),
+                ["-w", "-s", *manim_args],
+            )
+            env = {
+                **os.environ,
+                PROBE_ENV: str(probe_path),
+                CHECKPOINT_ENV: str(manifest_path),
+                BENCHMARK_ENV: str(get_benchmark_dir(probe_path)),
+            }
+            env.pop(SECTION_ENV, None)
+            run_manim(command, env)
+    return probe_path
+
+
+def get_fingerprints(
+    module_path: Path, scene_name: str, manim_args: list[str], cache_root: Path
+) -> tuple[list[tuple[str, str, float]], Path]:
+    """
+    Returns:
+        ((section, fingerprint, duration) for every section, probe path)
+    """
+    cache_dir = get_cache_dir(cache_root, module_path, scene_name)
+    static_keys = get_static_keys(module_path, scene_name, manim_args, cache_root)
+    probe_path = probe_scene(
+        module_path, scene_name, static_keys, manim_args, cache_dir
+    )
+    probe = json.loads(probe_path.read_text())
+    fingerprints = [
+        (
+            name,
+            hash_text(key, probe["entry_digests"][name]),
+            probe["durations"][name],
+        )
+        for name, key in static_keys
+    ]
+    return fingerprints, probe_path
+
+
+def render_section(
+    module_path: Path,
+    scene_name: str,
+    section_name: str,
+    fingerprint: str,
+    manim_args: list[str],
+    cache_dir: Path,
+    probe_path: Path,
+) -> Path:
+    """
+    Render one section into the cache and return the chunk path.
+
+    The manimgl process resumes from the probe's checkpoint of the section, or
+    replays the sections before it with animations skipped when it can't, so
+    sections render independently of each other. The probe tells
+    it how many frames each wait_until of the section lasts, and code slides
+    show the timings frozen for the probe, so a re-render draws the same ones.
+    """
+    chunk_path = cache_dir / f"{fingerprint}.mp4"
+    if chunk_path.exists():
+        return chunk_path
+
+    with tempfile.TemporaryDirectory(dir=cache_dir) as temp_dir:
+        command = get_manim_command(
+            module_path, scene_name, fingerprint, Path(temp_dir), ["-w", *manim_args]
+        )
+        env = {
+            **os.environ,
+            SECTION_ENV: section_name,
+            SCHEDULE_ENV: str(probe_path),
+            CHECKPOINT_ENV: str(get_checkpoint_manifest(probe_path)),
+            BENCHMARK_ENV: str(get_benchmark_dir(probe_path)),
+        }
+        env.pop(PROBE_ENV, None)
+        run_manim(command, env)
+        shutil.move(Path(temp_dir, chunk_path.name), chunk_path)
+    return chunk_path
+
+
+def concatenate(chunks: list[Path], output: Path) -> None:
+    """Join chunks with ffmpeg's concat demuxer, copying streams as they are"""
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as listing:
+        for chunk in chunks:
+            listing.write(f"file '{chunk.resolve()}'\n")
+    try:
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-y",
+                "-loglevel",
+                "error",
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                listing.name,
+                "-c",
+                "copy",
+                str(output),
+            ],
+            check=True,
+        )
+    finally:
+        os.remove(listing.name)
+
+
+def parse_render_args(
+    parser: argparse.ArgumentParser,
+) -> tuple[argparse.Namespace, list[str]]:
+    """
+    Parse the cache and quality flags plus the manimgl flags after '--'.
+
+    The chosen quality is exported to LAB_QUALITY for the manimgl processes.
+    """
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR)
+    parser.add_argument(
+        "--quality",
+        choices=list(QUALITY_PROFILES),
+        default=get_quality().name,
+        help="drawing detail, draft also renders at 480p",
+    )
+    argv = sys.argv[1:]
+    split = argv.index("--") if "--" in argv else len(argv)
+    args = parser.parse_args(argv[:split])
+    manim_args = argv[split + 1 :]
+    # Draft renders also drop to manimgl's low resolution
+    if args.quality == "draft":
+        manim_args = ["-l", *manim_args]
+    os.environ[QUALITY_ENV] = args.quality
+    return args, manim_args
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "file", type=Path, nargs="?", help="scene module, every lab if omitted"
+    )
+    parser.add_argument("scene", nargs="?", help="scene class, e.g. Lab2")
+    parser.add_argument(
+        "-o", "--output", type=Path, help="defaults to next to the module"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="number of manimgl processes to run at once",
+    )
+    args, manim_args = parse_render_args(parser)
+
+    if args.file is None:
+        scenes = discover_scenes(args.cache_dir)
+    elif args.scene is None:
+        parser.error("a scene class is required with a scene module")
+    else:
+        scenes = [(args.file.resolve(), args.scene)]
+    if args.output is not None and len(scenes) > 1:
+        parser.error("--output needs a single scene")
+
+    cache_dirs = []
+    for module_path, scene_name in scenes:
+        cache_dirs.append(get_cache_dir(args.cache_dir, module_path, scene_name))
+        cache_dirs[-1].mkdir(parents=True, exist_ok=True)
+
+    # Only a real render needs the process pool machinery
+    from labs.common.tex_cache import warm_tex_cache
+
+    count = warm_tex_cache([module_path for module_path, _ in scenes], args.jobs)
+    print(f"Compiled {count} Tex strings")
+
+    # Every job is a separate manimgl process, so threads are enough to keep
+    # the cores busy
+    with ThreadPoolExecutor(args.jobs) as pool:
+        probes = list(
+            pool.map(
+                lambda scene: get_fingerprints(*scene, manim_args, args.cache_dir),
+                scenes,
+            )
+        )
+
+        jobs = [
+            (
+                duration,
+                f"{scene_name}.{name}",
+                (module_path, scene_name, name, fingerprint, manim_args, cache_dir),
+                probe_path,
+            )
+            for (module_path, scene_name), cache_dir, (fingerprints, probe_path) in zip(
+                scenes, cache_dirs, probes, strict=True
+            )
+            for name, fingerprint, duration in fingerprints
+            if not (cache_dir / f"{fingerprint}.mp4").exists()
+        ]
+        total = sum(duration for duration, *_ in jobs)
+        print(f"Rendering {len(jobs)} sections, {total:.1f}s of video")
+
+        # Longest sections first, so the last ones to finish are short
+        futures = {
+            pool.submit(render_section, *job_args, probe_path): (duration, label)
+            for duration, label, job_args, probe_path in sorted(
+                jobs, key=lambda job: -job[0]
+            )
+        }
+        done = 0.0
+        for future in as_completed(futures):
+            future.result()
+            duration, label = futures[future]
+            done += duration
+            print(f"[{done:6.1f}/{total:.1f}s] {label}: rendered")
+
+    for (module_path, scene_name), cache_dir, (fingerprints, _) in zip(
+        scenes, cache_dirs, probes, strict=True
+    ):
+        output = args.output or module_path.with_name(f"{scene_name}.mp4")
+        concatenate(
+            [cache_dir / f"{fingerprint}.mp4" for _, fingerprint, _ in fingerprints],
+            output,
+        )
+        print(f"{scene_name}: wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
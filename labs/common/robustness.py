@@ -0,0 +1,117 @@
+"""
+Crash rates of the Lab2 controllers over thousands of random layouts.
+
+    python -m labs.common.robustness                        # 1000 of each kind
+    python -m labs.common.robustness --layouts 5000 --kinds track --seed 7
+
+Every controller drives every layout headlessly, with the car, speed and
+steering of Lab2.run_scenario, until it crashes or the time runs out. Layouts
+are generated from consecutive seeds inside a pool of worker processes, so a
+run is reproducible and only seeds cross process boundaries. For each layout
+kind and controller the crash rate and the distance driven are reported.
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from labs.common.follow_the_gap import (
+    GapFollower,
+    get_distance,
+    simulate_follow_the_gap,
+)
+from labs.common.layouts import LAYOUT_KINDS, generate_layout
+
+# The controllers of the Lab2 scenarios, at full quality
+CONTROLLERS = {
+    "naive": GapFollower(num_rays=15),
+    "disparity": GapFollower(use_disparity_extender=True),
+    "window": GapFollower(window_approach=True),
+}
+
+
+def evaluate_layout(
+    kind: str, seed: int, dt: float, duration: float
+) -> list[tuple[str, bool, float]]:
+    """(controller, crashed, distance) for every controller on one layout"""
+    layout = generate_layout(kind, seed)
+    results = []
+    for name, follower in CONTROLLERS.items():
+        trajectory, crashed = simulate_follow_the_gap(
+            layout.obstacles.segments,
+            layout.obstacles.contains,
+            layout.start,
+            layout.heading,
+            follower,
+            dt,
+            duration,
+        )
+        results.append((name, crashed, get_distance(trajectory)))
+    return results
+
+
+def evaluate(
+    kinds: list[str],
+    num_layouts: int,
+    seed: int = 0,
+    dt: float = 1 / 30,
+    duration: float = 10.0,
+    jobs: int | None = None,
+) -> dict[tuple[str, str], tuple[np.ndarray, np.ndarray]]:
+    """
+    Run every controller on `num_layouts` layouts of each kind.
+
+    Returns:
+        (crashed, distances) arrays per (kind, controller)
+    """
+    tasks = [(kind, seed + i) for kind in kinds for i in range(num_layouts)]
+    results = {}
+    with ProcessPoolExecutor(jobs) as pool:
+        outcomes = pool.map(
+            evaluate_layout,
+            *zip(*tasks, strict=True),
+            [dt] * len(tasks),
+            [duration] * len(tasks),
+            chunksize=max(1, len(tasks) // (4 * (jobs or os.cpu_count() or 1))),
+        )
+        for (kind, _), outcome in zip(tasks, outcomes, strict=True):
+            for name, crashed, distance in outcome:
+                results.setdefault((kind, name), []).append((crashed, distance))
+    return {
+        key: tuple(np.array(column) for column in zip(*values, strict=True))
+        for key, values in results.items()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--layouts", type=int, default=1000, help="layouts per kind")
+    parser.add_argument(
+        "--kinds", nargs="+", choices=list(LAYOUT_KINDS), default=list(LAYOUT_KINDS)
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first layout")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per run")
+    parser.add_argument(
+        "--fps", type=float, default=30, help="control ticks per second"
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    results = evaluate(
+        args.kinds, args.layouts, args.seed, 1 / args.fps, args.duration, args.jobs
+    )
+    print(
+        f"{'layouts':<8}{'controller':<12}{'crashes':>9}"
+        f"{'mean':>9}{'median':>9}{'p10':>9}"
+    )
+    for (kind, name), (crashed, distances) in results.items():
+        print(
+            f"{kind:<8}{name:<12}{crashed.mean():>9.1%}{distances.mean():>9.2f}"
+            f"{np.median(distances):>9.2f}{np.percentile(distances, 10):>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
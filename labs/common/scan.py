@@ -0,0 +1,94 @@
+"""
+LaserScan helpers: the beam geometry of a scan, angle to beam lookups and range
+cleaning. Everything works on scans shaped (..., num_beams), so a single scan
+and a batch of scans from many cars go through the same code.
+"""
+
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+
+import numpy as np
+
+ANGLE_MIN = np.radians(-135.0)
+ANGLE_MAX = np.radians(135.0)
+NUM_BEAMS = 1081
+MAX_RANGE = 10.0
+
+
+@dataclass(frozen=True)
+class ScanConfig:
+    """
+    Beam layout of a lidar, as in a LaserScan message.
+
+    Args:
+        angle_min: angle of the first beam
+        angle_max: angle of the last beam
+        num_beams: number of beams, evenly spaced from angle_min to angle_max
+        range_min: shortest range the lidar reports
+        range_max: longest range the lidar reports
+    """
+
+    angle_min: float = ANGLE_MIN
+    angle_max: float = ANGLE_MAX
+    num_beams: int = NUM_BEAMS
+    range_min: float = 0.0
+    range_max: float = MAX_RANGE
+
+    @cached_property
+    def angles(self) -> np.ndarray:
+        return np.linspace(self.angle_min, self.angle_max, self.num_beams)
+
+    @cached_property
+    def increment(self) -> float:
+        return (self.angle_max - self.angle_min) / (self.num_beams - 1)
+
+    def get_indices(self, angles) -> np.ndarray:
+        """
+        Index of the beam closest to each angle, shaped like `angles`.
+
+        Recent lookups are memoized per scan config and set of angles, so a
+        controller asking for the same beams every callback only pays for a
+        cache hit.
+        """
+        angles = np.asarray(angles, dtype=float)
+        return _get_indices(self, angles.shape, angles.tobytes())
+
+    def get_ranges(self, scans: np.ndarray, angles) -> np.ndarray:
+        """Ranges of the beams closest to `angles`, shaped (..., *angles.shape)"""
+        return scans[..., self.get_indices(angles)]
+
+    def clean(self, scans: np.ndarray) -> np.ndarray:
+        """
+        Scans with every reading in [range_min, range_max].
+
+        Following REP 117, +inf (no return) becomes range_max and -inf (too
+        close to measure) becomes range_min. NaN is an invalid reading rather
+        than open space, so it holds the last valid reading before it in its
+        scan, or range_min if there is none.
+        """
+        scans = np.asarray(scans, dtype=float)
+        last_valid = np.maximum.accumulate(
+            np.where(np.isnan(scans), 0, np.arange(scans.shape[-1])), axis=-1
+        )
+        return np.clip(
+            np.nan_to_num(
+                np.take_along_axis(scans, last_valid, axis=-1),
+                nan=self.range_min,
+                posinf=self.range_max,
+                neginf=self.range_min,
+            ),
+            self.range_min,
+            self.range_max,
+        )
+
+
+@lru_cache(maxsize=256)
+def _get_indices(config: ScanConfig, shape: tuple, angle_bytes: bytes) -> np.ndarray:
+    angles = np.frombuffer(angle_bytes).reshape(shape)
+    indices = np.clip(
+        np.round((angles - config.angle_min) / config.increment),
+        0,
+        config.num_beams - 1,
+    ).astype(int)
+    indices.setflags(write=False)
+    return indices
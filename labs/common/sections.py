@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+
+import numpy as np
+from manimlib import EndScene, Scene
+from manimlib.logger import log
+
+from labs.common.checkpoints import load_checkpoint, save_checkpoint
+from labs.common.profiling import PROFILE_ENV, Profiler, time_updaters
+from labs.common.quality import get_quality
+
+SECTION_ENV = "LAB_SECTION"
+PROBE_ENV = "LAB_PROBE"
+SCHEDULE_ENV = "LAB_SCHEDULE"
+CHECKPOINT_ENV = "LAB_CHECKPOINTS"
+
+
+def section(method):
+    """Mark a scene method as one section of the lecture"""
+    method.is_section = True
+    return method
+
+
+def get_state_digest(scene: Scene) -> str:
+    """Hash of everything on screen plus the global RNG"""
+    digest = hashlib.sha256()
+    for mob in scene.get_mobject_family_members():
+        digest.update(type(mob).__name__.encode())
+        digest.update(getattr(mob, "image_path", "").encode())
+        digest.update(mob.data.tobytes())
+        for key, value in sorted(mob.uniforms.items()):
+            digest.update(key.encode())
+            digest.update(np.asarray(value).tobytes())
+    _, keys, position, *_ = np.random.get_state()
+    digest.update(keys.tobytes())
+    digest.update(str(position).encode())
+    return digest.hexdigest()
+
+
+class SectionedScene(Scene):
+    """
+    Scene whose construct runs its @section methods in definition order.
+
+    Sections hand state to later sections through attributes on the scene. With
+    LAB_SECTION set only that section is written: the sections before it are
+    replayed with animations skipped to rebuild its entry state, and the scene
+    ends right after it. With LAB_PROBE set every section is skipped and the
+    digest of the scene state entering each one is written to that path.
+
+    wait_until keeps stepping the updaters frame by frame even while animations
+    are skipped, so the probe also dry-runs every simulation and records how
+    many frames each wait_until lasted and how long each section is. With
+    LAB_SCHEDULE naming such a probe, the target section waits for the known
+    number of frames, which gives manimgl a finite progress bar. The condition
+    is still checked every frame and a mismatch only logs a warning.
+
+    With LAB_CHECKPOINTS naming a JSON file that maps sections to checkpoint
+    paths, the scene state entering each listed section is saved to its path
+    unless it already exists, and a LAB_SECTION render with a checkpoint for
+    its section loads it instead of replaying the sections before it. A
+    checkpoint is only valid for the code and flags that shaped that state, so
+    the render driver keys each one by the sections before it.
+
+    Sections read their drawing detail from `self.quality`, the profile
+    named by LAB_QUALITY or else by `default_quality`. With LAB_PROFILE set the
+    frames, updaters and wait_until conditions are timed per section.
+    """
+
+    default_quality: str = "final"
+    profiler: Profiler | None = None
+    wait_frame_limit: int | None = None
+    # Bookkeeping of the section loop, not state that sections hand on
+    runtime_attributes = {"wait_frames", "scheduled_wait_frames", "wait_frame_limit"}
+
+    @classmethod
+    def get_sections(cls) -> list[str]:
+        names = []
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if getattr(value, "is_section", False) and name not in names:
+                    names.append(name)
+        return names
+
+    def construct(self):
+        self.quality = get_quality(self.default_quality)
+        profile_path = os.environ.get(PROFILE_ENV)
+        if profile_path is not None:
+            self.profiler = Profiler()
+        try:
+            self.run_sections()
+        finally:
+            if self.profiler is not None:
+                self.profiler.save(Path(profile_path))
+
+    def run_sections(self):
+        sections = self.get_sections()
+        target = os.environ.get(SECTION_ENV)
+        probe_path = os.environ.get(PROBE_ENV)
+        if target is not None and target not in sections:
+            raise ValueError(f"{type(self).__name__} has no section {target!r}")
+
+        scheduled_waits = {}
+        schedule_path = os.environ.get(SCHEDULE_ENV)
+        if target is not None and schedule_path is not None:
+            with open(schedule_path) as file:
+                schedule = json.load(file)
+            if schedule["fps"] == self.camera.fps:
+                scheduled_waits = schedule["waits"]
+
+        checkpoint_paths = {}
+        manifest_path = os.environ.get(CHECKPOINT_ENV)
+        if manifest_path is not None:
+            with open(manifest_path) as file:
+                checkpoint_paths = {
+                    name: Path(path) for name, path in json.load(file).items()
+                }
+        base_attributes = set(vars(self)) | self.runtime_attributes
+        start = 0
+        if (
+            target in checkpoint_paths
+            and checkpoint_paths[target].exists()
+            and probe_path is None
+        ):
+            load_checkpoint(self, checkpoint_paths[target])
+            start = sections.index(target)
+
+        entry_digests = {}
+        durations = {}
+        waits = {}
+        for name in sections[start:]:
+            checkpoint_path = checkpoint_paths.get(name)
+            if checkpoint_path is not None and not checkpoint_path.exists():
+                attributes = [key for key in vars(self) if key not in base_attributes]
+                try:
+                    save_checkpoint(self, checkpoint_path, attributes)
+                except (
+                    pickle.PicklingError,
+                    TypeError,
+                    AttributeError,
+                    OSError,
+                ) as error:
+                    # Unpicklable state or a failed write only means replaying,
+                    # never a failed render
+                    log.warning(f"No checkpoint for {name}: {error}")
+
+            if probe_path is not None:
+                self.skip_animations = True
+                entry_digests[name] = get_state_digest(self)
+            elif target is not None:
+                if name == target:
+                    if not self.original_skipping_status:
+                        self.stop_skipping()
+                else:
+                    self.skip_animations = True
+
+            if self.profiler is not None:
+                self.profiler.section = name
+            self.wait_frames = []
+            self.scheduled_wait_frames = list(scheduled_waits.get(name, []))
+            start_time = self.time
+            getattr(self, name)()
+            durations[name] = self.time - start_time
+            waits[name] = self.wait_frames
+
+            if name == target and probe_path is None:
+                raise EndScene()
+
+        if probe_path is not None:
+            probe = {
+                "fps": self.camera.fps,
+                "entry_digests": entry_digests,
+                "durations": durations,
+                "waits": waits,
+            }
+            with open(probe_path, "w") as file:
+                json.dump(probe, file, indent=2)
+            raise EndScene()
+
+    def update_frame(self, dt: float = 0, force_draw: bool = False) -> None:
+        if self.profiler is None:
+            return super().update_frame(dt, force_draw)
+        with self.profiler.span("update_frame", "frame", time=self.time):
+            super().update_frame(dt, force_draw)
+
+    def update_mobjects(self, dt: float) -> None:
+        if self.profiler is None:
+            return super().update_mobjects(dt)
+        time_updaters(self.mobjects, self.profiler)
+        with self.profiler.span("update_mobjects", "frame"):
+            super().update_mobjects(dt)
+
+    def emit_frame(self) -> None:
+        if self.profiler is None:
+            return super().emit_frame()
+        with self.profiler.span("emit_frame", "write"):
+            super().emit_frame()
+
+    def get_wait_time_progression(self, duration: float, stop_condition=None):
+        if stop_condition is None or self.wait_frame_limit is None:
+            return super().get_wait_time_progression(duration, stop_condition)
+        # Half a frame short of the limit so float rounding in np.arange can't
+        # add a frame; the times match those of the open-ended wait
+        return self.get_time_progression(
+            (self.wait_frame_limit - 0.5) / self.camera.fps,
+            desc=f"{self.num_plays} Simulating",
+            override_skip_animations=True,
+        )
+
+    def wait_until(self, stop_condition, max_time: float = 60):
+        if self.profiler is not None:
+            stop_condition = self.profiler.wrap(
+                stop_condition,
+                getattr(stop_condition, "__qualname__", "stop_condition"),
+                "condition",
+            )
+        frames = 0
+
+        def counted_condition():
+            nonlocal frames
+            frames += 1
+            return stop_condition()
+
+        if self.scheduled_wait_frames:
+            self.wait_frame_limit = self.scheduled_wait_frames.pop(0)
+        try:
+            super().wait_until(counted_condition, max_time)
+        finally:
+            scheduled, self.wait_frame_limit = self.wait_frame_limit, None
+
+        max_frames = len(np.arange(0, max_time, 1 / self.camera.fps))
+        if scheduled is not None and frames != scheduled:
+            log.warning(
+                f"wait_until stopped after {frames} frames, expected {scheduled}"
+            )
+        elif scheduled is not None and frames < max_frames and not stop_condition():
+            log.warning(f"wait_until still running after {frames} scheduled frames")
+            super().wait_until(counted_condition, max_time - frames / self.camera.fps)
+        self.wait_frames.append(frames)
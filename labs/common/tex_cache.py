@@ -0,0 +1,143 @@
+"""
+Compile the LaTeX of a scene module ahead of its render.
+
+    python -m labs.common.tex_cache labs/lab1/lab1.py labs/lab2/lab2.py
+
+Tex and TexText calls are collected from the module source without importing
+it, then built in a pool of worker processes. Each build goes through manimgl's
+own latex_to_svg, so the SVGs land in its content-addressed disk cache and the
+render only reads them back. Only the arguments that change the compiled LaTeX
+are kept; sizes and colors are applied after compilation and don't matter.
+"""
+
+import argparse
+import ast
+import os
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+TEX_CLASSES = {"Tex", "TexText"}
+LATEX_KEYWORDS = {
+    "alignment",
+    "template",
+    "additional_preamble",
+    "isolate",
+    "protect",
+    "use_labelled_svg",
+}
+COLOR_MAP_KEYWORDS = {"t2c", "tex_to_color_map"}
+
+
+@dataclass
+class TexSpec:
+    """Everything needed to rebuild one Tex or TexText call"""
+
+    cls: str
+    strings: tuple[str, ...]
+    kwargs: dict = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return repr((self.cls, self.strings, sorted(self.kwargs.items())))
+
+
+def read_tex_call(node: ast.Call) -> TexSpec | None:
+    """TexSpec for a call whose LaTeX is fixed in the source, else None"""
+    try:
+        strings = tuple(ast.literal_eval(arg) for arg in node.args)
+    except ValueError:
+        return None
+    if not all(isinstance(string, str) for string in strings):
+        return None
+
+    kwargs = {}
+    for keyword in node.keywords:
+        if keyword.arg is None:
+            return None
+        if keyword.arg in COLOR_MAP_KEYWORDS:
+            # Only the keys are isolated in the LaTeX, the colors come later
+            if not isinstance(keyword.value, ast.Dict):
+                return None
+            try:
+                keys = [ast.literal_eval(key) for key in keyword.value.keys]
+            except ValueError:
+                return None
+            kwargs[keyword.arg] = dict.fromkeys(keys, "#FFFFFF")
+        elif keyword.arg in LATEX_KEYWORDS:
+            try:
+                kwargs[keyword.arg] = ast.literal_eval(keyword.value)
+            except ValueError:
+                return None
+    return TexSpec(node.func.id, strings, kwargs)
+
+
+def collect_tex(module_path: Path) -> list[TexSpec]:
+    """Distinct Tex and TexText calls in a module with literal arguments"""
+    specs = {}
+    for node in ast.walk(ast.parse(module_path.read_text())):
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and node.func.id in TEX_CLASSES
+        ):
+            spec = read_tex_call(node)
+            if spec is not None:
+                specs.setdefault(spec.key, spec)
+    return list(specs.values())
+
+
+def init_worker() -> None:
+    # manimlib reads its config from the command line and the working
+    # directory when it is first imported
+    sys.argv = sys.argv[:1]
+    os.chdir(REPO_ROOT)
+
+
+def build_tex(spec: TexSpec) -> str | None:
+    """Build one spec, returning the LaTeX error if it fails to compile"""
+    import manimlib
+    from manimlib.utils.tex_file_writing import LatexError
+
+    # A failed compile, a missing LaTeX binary or a disk cache another worker
+    # holds locked; the render compiles whatever is left itself
+    try:
+        getattr(manimlib, spec.cls)(*spec.strings, **spec.kwargs)
+    except (LatexError, OSError, sqlite3.Error) as error:
+        return f"{spec.cls}{spec.strings}: {error}"
+    return None
+
+
+def warm_tex_cache(module_paths: list[Path], jobs: int | None = None) -> int:
+    """
+    Compile every literal Tex and TexText in the modules concurrently.
+
+    Returns:
+        number of distinct specs compiled
+    """
+    specs = {}
+    for module_path in module_paths:
+        for spec in collect_tex(module_path):
+            specs.setdefault(spec.key, spec)
+
+    with ProcessPoolExecutor(jobs, initializer=init_worker) as pool:
+        for error in pool.map(build_tex, specs.values()):
+            if error is not None:
+                print(f"LaTeX error in {error}", file=sys.stderr)
+    return len(specs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("files", type=Path, nargs="+", help="scene modules")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    count = warm_tex_cache([file.resolve() for file in args.files], args.jobs)
+    print(f"Compiled {count} Tex strings")
+
+
+if __name__ == "__main__":
+    main()
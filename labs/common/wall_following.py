@@ -0,0 +1,141 @@
+"""
+Wall following from Lab 1: lidar rays cast against wall segments, the a/b beam
+geometry and a closed PID loop. Everything here works on arrays of cars so the
+same code drives the scene and headless batch runs.
+"""
+
+import numpy as np
+
+from labs.common.integrators import integrate_pose
+from labs.common.pid import PID, BatchPID
+from labs.common.scan import MAX_RANGE, ScanConfig
+
+LOOKAHEAD = 1.5
+
+
+def cast_rays(
+    origins: np.ndarray,
+    angles: np.ndarray,
+    walls: np.ndarray,
+    max_range: float = MAX_RANGE,
+) -> np.ndarray:
+    """
+    Distance from each origin along each beam to the nearest wall.
+
+    Args:
+        origins: (N, 2) ray origins
+        angles: (N, K) world-frame beam angles
+        walls: (M, 2, 2) wall segments as [start, end]
+        max_range: range reported for beams that hit nothing
+
+    Returns:
+        (N, K) array of ranges
+    """
+    directions = np.stack([np.cos(angles), np.sin(angles)], axis=-1)[:, :, None]
+    starts = walls[None, None, :, 0]
+    spans = walls[None, None, :, 1] - starts
+    offsets = starts - origins[:, None, None, :]
+
+    def cross(u, v):
+        return u[..., 0] * v[..., 1] - u[..., 1] * v[..., 0]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denominator = cross(directions, spans)
+        t = cross(offsets, spans) / denominator
+        u = cross(offsets, directions) / denominator
+    hit = (denominator != 0) & (t >= 0) & (u >= 0) & (u <= 1)
+    return np.minimum(np.where(hit, t, np.inf).min(axis=-1), max_range)
+
+
+def polyline_walls(*polylines) -> np.ndarray:
+    """Turn polylines [(x, y), ...] into an (M, 2, 2) array of wall segments"""
+    segments = [
+        [start, end]
+        for polyline in polylines
+        for start, end in zip(polyline[:-1], polyline[1:], strict=True)
+    ]
+    return np.array(segments, dtype=float)
+
+
+def get_distance_from_wall(
+    lidar_range_array: np.ndarray, scan: ScanConfig | None = None
+) -> np.ndarray:
+    """
+    Projected distance to the left wall, D + L sin(alpha), per scan.
+
+    The scans are cleaned before the a and b beams are read. Without a `scan`
+    config the beams span the default field of view.
+    """
+    scan = scan or ScanConfig(num_beams=lidar_range_array.shape[-1])
+    lidar_range_array = scan.clean(lidar_range_array)
+    theta = np.radians(45.0)
+    b = scan.get_ranges(lidar_range_array, np.radians(90))
+    a = scan.get_ranges(lidar_range_array, np.radians(45))
+    alpha = np.arctan2(a * np.cos(theta) - b, a * np.sin(theta))
+    D = b * np.cos(alpha)
+    return D + LOOKAHEAD * np.sin(alpha)
+
+
+def wall_following_step(
+    poses: np.ndarray,
+    pid: BatchPID,
+    walls: np.ndarray,
+    speed: float | np.ndarray,
+    dt: float,
+    scan: ScanConfig | None = None,
+    integrator: str = "semi_implicit_euler",
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Advance N cars one control tick: scan, wall distance, PID, kinematics.
+
+    The PID setpoint is the desired distance to the left wall, so a positive
+    error (too close) steers right.
+
+    Args:
+        poses: (N, 3) array of [x, y, heading]
+        pid: controllers of all N cars, updated in place
+        walls: (M, 2, 2) wall segments
+        speed: forward speed, scalar or per car
+        scan: beam layout of the lidar, the default ScanConfig if None. Its
+            readings are cleaned like a real scan's, so beams that hit nothing
+            read range_max
+
+    Returns:
+        (new_poses, ranges) where ranges is the cleaned (N, K) scan at `poses`
+    """
+    scan = scan or ScanConfig()
+    ranges = scan.clean(
+        cast_rays(poses[:, :2], poses[:, 2:3] + scan.angles[None, :], walls, np.inf)
+    )
+    distances = get_distance_from_wall(ranges, scan)
+    omegas = -pid.update(distances, dt)
+    return integrate_pose(poses, speed, omegas, dt, integrator), ranges
+
+
+def simulate_wall_following(
+    walls: np.ndarray,
+    poses: np.ndarray,
+    pids: list[PID],
+    speed: float | np.ndarray = 1.5,
+    dt: float = 1 / 30,
+    steps: int = 300,
+    scan: ScanConfig | None = None,
+    integrator: str = "semi_implicit_euler",
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Run a batch of wall-following cars headlessly.
+
+    Returns:
+        (trajectory, errors): (steps + 1, N, 3) poses and (steps, N) PID errors
+    """
+    pid = BatchPID.from_pids(pids)
+    scan = scan or ScanConfig()
+    trajectory = [np.asarray(poses, dtype=float)]
+    errors = []
+    for _ in range(steps):
+        poses, _ = wall_following_step(
+            trajectory[-1], pid, walls, speed, dt, scan, integrator
+        )
+        trajectory.append(poses)
+        errors.append(pid.previous_error)
+    return np.array(trajectory), np.array(errors)
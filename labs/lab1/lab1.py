@@ -1,41 +1,22 @@
-from dataclasses import dataclass
-from typing import Optional, Tuple, List
-from manimlib import *
+import sys
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
+from manimlib import *
 
-@dataclass
-class PID:
-    kp: float = 0.0
-    ki: float = 0.0
-    kd: float = 0.0
-    setpoint: float = 0.0
-    out_limits: Tuple[Optional[float], Optional[float]] = (-1.0, 1.0)
-    integral: float = 0.0
-    previous_error: Optional[float] = None
-
-    def reset(self) -> None:
-        self.integral = 0.0
-        self.previous_error = None
-
-    def update(
-        self, measurement: float, dt: Optional[float]
-    ) -> Tuple[float, float, float, float]:
-        error: float = self.setpoint - measurement
-        if dt and dt > 0.0:
-            self.integral += error * dt
-        derivative: float = (
-            (error - self.previous_error) / dt
-            if dt and dt > 0.0 and self.previous_error is not None
-            else 0.0
-        )
-        u: float = self.kp * error + self.ki * self.integral + self.kd * derivative
-        low, high = self.out_limits
-        if low is not None and u < low:
-            u = low
-        if high is not None and u > high:
-            u = high
-        self.previous_error = error
-        return u, self.kp * error, self.ki * self.integral, self.kd * derivative
+from labs.common.assets import get_image
+from labs.common.integrators import integrate_pose
+from labs.common.pid import PID, BatchPID
+from labs.common.plotting import PlotTraces
+from labs.common.scan import ScanConfig
+from labs.common.sections import SectionedScene, section
+from labs.common.wall_following import (
+    cast_rays,
+    polyline_walls,
+    wall_following_step,
+)
 
 
 def create_legend(legend_data: List[Tuple[str, str]]) -> VGroup:
@@ -59,14 +40,14 @@ def create_plotting_updater(
     max_speed: float,
     line_y: float,
     line_end_x: float,
-    axes: Optional[Axes] = None,
-    segments: Optional[list] = None,
-    scene: Optional[Scene] = None,
-    plot_data: Optional[dict] = None,
+    traces: Optional[PlotTraces] = None,
+    integrator: str = "semi_implicit_euler",
+    plot_interval: float = 0.0,
 ) -> callable:
-    """Create car movement updater with plotting"""
+    """Create car movement updater with plotting, sampled every plot_interval"""
     heading: ValueTracker = ValueTracker(heading)
     time_tracker: ValueTracker = ValueTracker(0)
+    next_sample_time = 0.0
     speed: ValueTracker = ValueTracker(0)
     data = [
         ("error", RED),
@@ -77,6 +58,7 @@ def create_plotting_updater(
     ]
 
     def follow_path_with_plots(mob: Mobject, dt: float) -> None:
+        nonlocal next_sample_time
         if not dt or dt <= 0:
             return
         x, y, _ = mob.get_center()
@@ -85,22 +67,11 @@ def create_plotting_updater(
         omega, p, i, d = pid.update(e, dt)
 
         current_time = time_tracker.get_value()
-        if plot_data is not None and axes is not None and segments is not None:
+        if traces is not None and current_time >= next_sample_time:
             for (key, color), value in zip(data, [e, omega, p, i, d]):
-                if key in plot_data:
-                    plot_data[key].append([current_time, value, 0])
-                    if len(plot_data[key]) > 1:
-                        segment = Line(
-                            axes.coords_to_point(*plot_data[key][-2][:2]),
-                            axes.coords_to_point(*plot_data[key][-1][:2]),
-                            color=color,
-                            stroke_width=2,
-                        )
-                        segments.append(segment)
-                        scene.add(segment)
-
-        mob.rotate(omega * dt)
-        heading.increment_value(omega * dt)
+                traces.add_sample(key, current_time, value, color)
+            next_sample_time = current_time + plot_interval
+
         time_tracker.increment_value(dt)
 
         current_speed = speed.get_value()
@@ -112,17 +83,66 @@ def create_plotting_updater(
             speed.set_value(0)
             mob.remove_updater(follow_path_with_plots)
 
-        current_speed = speed.get_value()
         current_heading = heading.get_value()
-        dx: float = current_speed * np.cos(current_heading) * dt
-        dy: float = current_speed * np.sin(current_heading) * dt
-        mob.move_to([x + dx, y + dy, 0])
+        x, y, new_heading = integrate_pose(
+            [x, y, current_heading], speed.get_value(), omega, dt, integrator
+        )
+        mob.rotate(new_heading - current_heading)
+        heading.set_value(new_heading)
+        mob.move_to([x, y, 0])
 
     return follow_path_with_plots
 
 
-class Lab1(Scene):
-    def construct(self):
+def create_wall_following_updater(
+    pid: PID,
+    walls: np.ndarray,
+    heading: float,
+    speed: float,
+    rays: List[Line],
+    end_y: float,
+    integrator: str = "semi_implicit_euler",
+) -> callable:
+    """Create car updater that follows the left wall using the a/b lidar beams"""
+    pose = np.array([[0.0, 0.0, heading]])
+    scan = ScanConfig(num_beams=len(rays))
+    batch_pid = BatchPID.from_pids([pid])
+
+    def draw_rays(center: np.ndarray, ranges: np.ndarray) -> None:
+        for ray, angle, length in zip(
+            rays, pose[0, 2] + scan.angles, ranges, strict=True
+        ):
+            ray.put_start_and_end_on(
+                center, center + length * np.array([np.cos(angle), np.sin(angle), 0])
+            )
+
+    def follow_wall(mob: Mobject, dt: float) -> None:
+        center = mob.get_center()
+        pose[0, :2] = center[:2]
+        if not dt or dt <= 0:
+            draw_rays(
+                center,
+                scan.clean(cast_rays(pose[:, :2], pose[:, 2:] + scan.angles, walls))[0],
+            )
+            return
+
+        new_pose, ranges = wall_following_step(
+            pose, batch_pid, walls, speed, dt, scan, integrator=integrator
+        )
+        draw_rays(center, ranges[0])
+
+        mob.rotate(new_pose[0, 2] - pose[0, 2])
+        mob.move_to([new_pose[0, 0], new_pose[0, 1], 0])
+        pose[:] = new_pose
+        if pose[0, 1] >= end_y:
+            mob.remove_updater(follow_wall)
+
+    return follow_wall
+
+
+class Lab1(SectionedScene):
+    @section
+    def title(self):
         # Title
         title = TexText("F1tenth Lab 1:", font_size=100).shift(1 * UP)
         title2 = TexText("Wall Following")
@@ -132,6 +152,8 @@ class Lab1(Scene):
         self.wait()
         self.play(FadeOut(title), FadeOut(title2))
 
+    @section
+    def outline(self):
         # Outline
         outline_title = TexText("Outline:", font_size=100).shift(UP * 2)
         outline = (
@@ -149,6 +171,8 @@ class Lab1(Scene):
         self.wait()
         self.play(FadeOut(outline_title), FadeOut(outline))
 
+    @section
+    def what_is_pid(self):
         # What is PID?
         what_is_pid_title = TexText("What is PID?")
         self.play(Write(what_is_pid_title))
@@ -162,7 +186,7 @@ class Lab1(Scene):
             line_y * UP + line_start_x * RIGHT, line_y * UP + line_end_x * RIGHT
         )
         car = (
-            ImageMobject("labs/lab1/car_topview.png")
+            get_image("labs/lab1/car_topview.png")
             .scale(0.07)
             .shift(line_y * UP + line_start_x * RIGHT)
             .rotate(heading)
@@ -182,16 +206,18 @@ class Lab1(Scene):
         self.wait_until(lambda: follow_path not in car.updaters)
         self.play(FadeOut(car), FadeOut(what_is_pid_title))
 
+    @section
+    def pid_block_diagram(self):
         # PID block diagram
-        error_text = Tex(r"\text{Error}").set_color(RED).shift(LEFT * 4)
+        self.error_text = Tex(r"\text{Error}").set_color(RED).shift(LEFT * 4)
         pid_box = Rectangle(width=2, height=1).shift(ORIGIN)
         pid_text = Tex(r"\text{PID}").move_to(pid_box.get_center())
         output_text = Tex(r"\text{Action}").set_color(GREEN).shift(RIGHT * 4)
 
-        arrow1 = Arrow(error_text.get_right(), pid_box.get_left(), buff=0.1)
+        arrow1 = Arrow(self.error_text.get_right(), pid_box.get_left(), buff=0.1)
         arrow2 = Arrow(pid_box.get_right(), output_text.get_left(), buff=0.1)
 
-        self.play(Write(error_text))
+        self.play(Write(self.error_text))
         self.play(GrowArrow(arrow1))
         self.play(Write(pid_box), Write(pid_text))
         self.play(GrowArrow(arrow2))
@@ -206,6 +232,8 @@ class Lab1(Scene):
             FadeOut(output_text),
         )
 
+    @section
+    def error_equation(self):
         # Error equation
         error_eq = Tex(
             r"\text{Error}",
@@ -221,10 +249,12 @@ class Lab1(Scene):
             }
         )
 
-        self.play(TransformMatchingTex(error_text, error_eq))
+        self.play(TransformMatchingTex(self.error_text, error_eq))
         self.wait()
         self.play(FadeOut(error_eq))
 
+    @section
+    def another_look_at_pid(self):
         # Another look at PID
         what_is_pid_title = TexText("Another look at PID")
         self.play(Write(what_is_pid_title))
@@ -248,12 +278,11 @@ class Lab1(Scene):
         )
         legend_group = create_legend([("Error", RED), ("Steering", BLUE)])
         car = (
-            ImageMobject("labs/lab1/car_topview.png")
+            get_image("labs/lab1/car_topview.png")
             .scale(0.07)
             .shift(line_start_x * RIGHT + line_y * UP)
             .rotate(heading)
         )
-        segments = []
 
         self.wait()
         self.play(Transform(what_is_pid_title, line))
@@ -261,6 +290,8 @@ class Lab1(Scene):
         self.play(Write(legend_group))
         self.play(FadeIn(car))
 
+        traces = PlotTraces(axes, ["error", "steering"])
+        self.add(traces)
         follow_path = create_plotting_updater(
             pid=PID(kp=2.0, ki=0.1, kd=2.0, setpoint=0.0, out_limits=(-2.0, 2.0)),
             heading=heading,
@@ -268,10 +299,8 @@ class Lab1(Scene):
             max_speed=1.5,
             line_y=line_y,
             line_end_x=line_end_x,
-            axes=axes,
-            segments=segments,
-            scene=self,
-            plot_data={"error": [], "steering": []},
+            traces=traces,
+            plot_interval=self.quality.plot_interval,
         )
         car.add_updater(follow_path)
         self.wait_until(lambda: follow_path not in car.updaters)
@@ -279,16 +308,21 @@ class Lab1(Scene):
             FadeOut(car),
             FadeOut(what_is_pid_title),
             FadeOut(axes),
-            *[FadeOut(segment) for segment in segments],
+            FadeOut(traces),
             FadeOut(legend_group),
         )
+        traces.release()
 
+    @section
+    def implementing_pid_title(self):
         # Implementing PID title
         implement_pid_title = TexText("Implementing PID")
         self.play(Write(implement_pid_title))
         self.wait()
         self.play(FadeOut(implement_pid_title))
 
+    @section
+    def implementing_pid(self):
         # Implementing PID
         pid_equation = Tex(
             r"u(t) = K_p e(t) + K_i \int_0^t e(\tau) d\tau + K_d \frac{de(t)}{dt}"
@@ -331,6 +365,8 @@ class Lab1(Scene):
             FadeOut(pid_equation_colored),
         )
 
+    @section
+    def breakdown_of_pid(self):
         # Breakdown of PID
         what_is_pid_title = TexText("Breakdown of PID")
         self.play(Write(what_is_pid_title))
@@ -362,18 +398,19 @@ class Lab1(Scene):
             ]
         )
         car = (
-            ImageMobject("labs/lab1/car_topview.png")
+            get_image("labs/lab1/car_topview.png")
             .scale(0.07)
             .shift(line_start_x * RIGHT + line_y * UP)
             .rotate(heading)
         )
-        segments = []
 
         self.play(Transform(what_is_pid_title, line))
         self.play(Write(axes))
         self.play(Write(legend_group))
         self.play(FadeIn(car))
 
+        traces = PlotTraces(axes, ["error", "proportional", "integral", "derivative"])
+        self.add(traces)
         follow_path = create_plotting_updater(
             pid=PID(kp=2.0, ki=0.1, kd=2.0, setpoint=0.0, out_limits=(-2.0, 2.0)),
             heading=heading,
@@ -381,15 +418,8 @@ class Lab1(Scene):
             max_speed=1.5,
             line_y=line_y,
             line_end_x=line_end_x,
-            axes=axes,
-            segments=segments,
-            scene=self,
-            plot_data={
-                "error": [],
-                "proportional": [],
-                "integral": [],
-                "derivative": [],
-            },
+            traces=traces,
+            plot_interval=self.quality.plot_interval,
         )
         car.add_updater(follow_path)
         self.wait_until(lambda: follow_path not in car.updaters)
@@ -397,10 +427,13 @@ class Lab1(Scene):
             FadeOut(car),
             FadeOut(what_is_pid_title),
             FadeOut(axes),
-            *[FadeOut(segment) for segment in segments],
+            FadeOut(traces),
             FadeOut(legend_group),
         )
+        traces.release()
 
+    @section
+    def wall_following(self):
         # Wall following!
         wall_following_title = TexText("Wall following!")
         self.play(Write(wall_following_title))
@@ -411,7 +444,7 @@ class Lab1(Scene):
         angle_range = 270 * DEGREES
         start_angle = -20 * DEGREES
         car = (
-            ImageMobject("labs/lab1/car_topview.png")
+            get_image("labs/lab1/car_topview.png")
             .rotate(PI / 2 + PI / 4 + start_angle)
             .shift(DOWN * 2)
             .scale(0.2)
@@ -640,5 +673,44 @@ class Lab1(Scene):
         )
         self.wait()
 
+    @section
+    def wall_following_simulation(self):
+        # Wall following simulation
+        walls = polyline_walls(
+            [(-7, 1), (2, 1), (2, 4.5)], [(-7, -2), (4.5, -2), (4.5, 4.5)]
+        )
+        wall_lines = VGroup(
+            *[Line([*start, 0], [*end, 0], stroke_width=6) for start, end in walls]
+        )
+        heading = 0.3
+        car = (
+            get_image("labs/lab1/car_topview.png")
+            .scale(0.07)
+            .shift(6 * LEFT + 0.8 * DOWN)
+            .rotate(heading)
+        )
+        rays = [Line(ORIGIN, RIGHT, stroke_width=1, color=RED) for _ in range(37)]
+        rays[24].set_stroke(TEAL, width=4)
+        rays[30].set_stroke(YELLOW, width=4)
+        rays_group = VGroup(*rays)
+
+        follow_wall = create_wall_following_updater(
+            pid=PID(kp=2.0, ki=0.1, kd=0.1, setpoint=1.0, out_limits=(-2.0, 2.0)),
+            walls=walls,
+            heading=heading,
+            speed=1.5,
+            rays=rays,
+            end_y=3.5,
+        )
+        follow_wall(car, 0)
+        self.play(Write(wall_lines), FadeIn(car), FadeIn(rays_group))
+        self.wait()
+        car.add_updater(follow_wall)
+        self.wait_until(lambda: follow_wall not in car.updaters, max_time=15)
+        self.play(FadeOut(car), FadeOut(rays_group), FadeOut(wall_lines))
+
+    @section
+    def the_end(self):
+        # The End
         the_end = TexText("The End!", font_size=100)
         self.play(Write(the_end))
@@ -1,8 +1,22 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
 from manimlib import *
 
+from labs.common.benchmark import CONTROL_RATE, get_benchmarked_code
+from labs.common.calculus import GraphSecant, IncrementalRiemannRectangles
+from labs.common.code_blocks import get_code
+from labs.common.pid import PID
+from labs.common.scan import MAX_RANGE, NUM_BEAMS
+from labs.common.sections import SectionedScene, section
+from labs.common.wall_following import get_distance_from_wall
 
-class Lab1p2(Scene):
-    def construct(self):
+
+class Lab1p2(SectionedScene):
+    @section
+    def title(self):
         # Title
         title = TexText("F1tenth Lab 1 Part 2:").shift(1 * UP)
         title2 = TexText("Wall Following Code")
@@ -12,6 +26,8 @@ class Lab1p2(Scene):
         self.wait()
         self.play(FadeOut(title), FadeOut(title2))
 
+    @section
+    def outline(self):
         # Outline
         outline_title = TexText("Outline:", font_size=100).shift(UP * 2)
         outline = (
@@ -28,6 +44,8 @@ class Lab1p2(Scene):
         self.wait()
         self.play(FadeOut(outline_title), FadeOut(outline))
 
+    @section
+    def implementing_pid(self):
         # Implementing PID
         title = TexText("Implementing PID")
 
@@ -35,6 +53,8 @@ class Lab1p2(Scene):
         self.wait()
         self.play(FadeOut(title))
 
+    @section
+    def calculating_integral(self):
         # Calculating Integral
         axes = Axes((-1, 12), (-1, 6))
         axes.add_coordinate_labels()
@@ -52,15 +72,15 @@ class Lab1p2(Scene):
 
         x_tracker = ValueTracker(0)
         dot1 = Dot(color=RED)
-        rectangles = always_redraw(
-            lambda: axes.get_riemann_rectangles(
-                graph,
-                x_range=[0, x_tracker.get_value()],
-                dx=0.5,
-                fill_opacity=0.6,
-                stroke_width=1,
-            )
-        )
+        rectangles = IncrementalRiemannRectangles(
+            axes,
+            graph,
+            x_range=(0, 5),
+            dx=0.5 * self.quality.riemann_dx_scale,
+            fill_opacity=0.6,
+            stroke_width=1,
+        )
+        rectangles.add_updater(lambda m: m.set_edge(x_tracker.get_value()))
         f_always(dot1.move_to, lambda: axes.i2gp(x_tracker.get_value(), graph))
         self.play(FadeIn(dot1), ShowCreation(rectangles))
         self.play(x_tracker.animate.set_value(5), run_time=5)
@@ -74,8 +94,10 @@ class Lab1p2(Scene):
             FadeOut(rectangles),
         )
 
+    @section
+    def integral_code(self):
         # Integral code
-        code = Code(
+        code = get_code(
             "def update(self, measurement: float, dt: Optional[float]) -> float:\n"
             "   self.integral += error * dt"
         )
@@ -83,6 +105,8 @@ class Lab1p2(Scene):
         self.wait()
         self.play(FadeOut(code))
 
+    @section
+    def calculating_derivative(self):
         # Calculating Derivative
         axes = Axes((-1, 12), (-1, 6))
         axes.add_coordinate_labels()
@@ -98,18 +122,9 @@ class Lab1p2(Scene):
         )
 
         x_tracker = ValueTracker(0)
-        dt = 1
-        dot1 = Dot()
-        dot2 = Dot()
-        f_always(dot1.move_to, lambda: axes.i2gp(x_tracker.get_value(), graph))
-        f_always(dot2.move_to, lambda: axes.i2gp(x_tracker.get_value() + dt, graph))
-        line = always_redraw(
-            lambda: Line(
-                axes.i2gp(x_tracker.get_value(), graph),
-                axes.i2gp(x_tracker.get_value() + dt, graph),
-                color=RED,
-            ).set_length(4)
-        )
+        line = GraphSecant(axes, graph, x_tracker, dx=1, length=4, color=RED)
+        dot1 = line.get_dot(0)
+        dot2 = line.get_dot(1)
 
         self.play(FadeIn(dot1), FadeIn(dot2), ShowCreation(line))
         self.play(x_tracker.animate.set_value(9), run_time=5)
@@ -124,8 +139,10 @@ class Lab1p2(Scene):
             FadeOut(line),
         )
 
+    @section
+    def derivative_code(self):
         # Derivative code
-        code = Code(
+        code = get_code(
             "def update(self, measurement: float, dt: Optional[float]) -> float:\n"
             "   derivative = (error - self.previous_error) / dt\n"
             "   self.previous_error = error"
@@ -134,37 +151,31 @@ class Lab1p2(Scene):
         self.wait()
         self.play(FadeOut(code))
 
+    @section
+    def full_pid_code(self):
         # Full PID code
-        code = Code(
-            """def update(self, measurement: float, dt: Optional[float]) -> float:
-            error: float = self.setpoint - measurement
-            if dt and dt > 0.0:
-                self.integral += error * dt
-            derivative: float = (
-                (error - self.previous_error) / dt
-                if dt and dt > 0.0 and self.previous_error is not None
-                else 0.0
-            )
-            u: float = self.kp * error + self.ki * self.integral + self.kd * derivative
-            low, high = self.out_limits
-            if low is not None and u < low:
-                u = low
-            if high is not None and u > high:
-                u = high
-            self.previous_error = error
-            return u
-        """
+        pid = PID(kp=2.0, ki=0.1, kd=0.1, setpoint=1.0, out_limits=(-2.0, 2.0))
+        code = get_benchmarked_code(
+            pid.update,
+            0.8,
+            1 / CONTROL_RATE,
+            name="PID.update",
+            measure=not self.skip_animations,
         )
         self.play(Write(code))
         self.wait()
         self.play(FadeOut(code))
 
+    @section
+    def implementing_wall_following(self):
         # Implementing Wall Following
         title = TexText("Implementing Wall Following")
         self.play(Write(title))
         self.wait()
         self.play(FadeOut(title))
 
+    @section
+    def wall_following_code(self):
         # Wall Following code
         alpha_equation = Tex(
             r"\alpha",
@@ -172,10 +183,10 @@ class Lab1p2(Scene):
             r"\arctan\left(\frac{a\cos(\theta) - b}{a\sin(\theta)}\right)",
         )
         D_equation = Tex("D", " = ", "b", r"\cos(\alpha)").next_to(alpha_equation, DOWN)
-        alpha_code = Code(
+        alpha_code = get_code(
             "alpha = np.arctan2(a * np.cos(theta) - b, a * np.sin(theta))"
         )
-        D_code = Code("D = b * np.cos(alpha)").next_to(alpha_code, DOWN)
+        D_code = get_code("D = b * np.cos(alpha)").next_to(alpha_code, DOWN)
         self.play(Write(alpha_equation))
         self.play(Write(D_equation))
         self.wait()
@@ -183,16 +194,12 @@ class Lab1p2(Scene):
         self.wait()
         self.play(Transform(D_equation, D_code))
         self.wait()
-        full_wall_following_code = Code(
-            """def get_distance_from_wall(lidar_range_array: np.ndarray[Any] | None):
-            theta = np.radians(45.0)
-            b = get_range(lidar_range_array, np.radians(90))
-            a = get_range(lidar_range_array, np.radians(45))
-            alpha = np.arctan2(a * np.cos(theta) - b, a * np.sin(theta))
-            D = b * np.cos(alpha)
-            error = D + 1.5 * np.sin(alpha)
-            
-            return error"""
+        scan = np.random.default_rng(0).uniform(0.5, MAX_RANGE, NUM_BEAMS)
+        full_wall_following_code = get_benchmarked_code(
+            get_distance_from_wall,
+            scan,
+            name="get_distance_from_wall",
+            measure=not self.skip_animations,
         )
         self.play(
             FadeOut(D_equation),
@@ -202,12 +209,16 @@ class Lab1p2(Scene):
         self.wait()
         self.play(FadeOut(full_wall_following_code))
 
+    @section
+    def competition(self):
         # Competition
         title = TexText("Competition!")
         self.play(Write(title))
         self.wait()
         self.play(FadeOut(title))
 
+    @section
+    def end(self):
         # End
         end_text = TexText("Thank you!")
         self.play(Write(end_text))
@@ -1,125 +1,93 @@
-from enum import Enum
-from manimlib import *
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
-class ObstacleType(Enum):
-    POSITIVE_SPACE = 1
-    NEGATIVE_SPACE = 2
+from manimlib import *
 
+from labs.common.assets import get_image
+from labs.common.follow_the_gap import extend_disparities
+from labs.common.integrators import integrate_pose
+from labs.common.kernels import BACKEND, best_window
+from labs.common.obstacles import ObstacleType, PolygonObstacles
+from labs.common.scan import ScanConfig
+from labs.common.sections import SectionedScene, section
 
-def get_is_in(*obstacles: tuple[Mobject, ObstacleType]):
-    """
-    Check if a point is inside any of the obstacles.
-
-    Args:
-        obstacles: tuples of (obstacle, is_negative_space) where is_negative_space
-                  indicates if the obstacle should be treated as negative space (inverted)
-    """
-
-    def is_in(sample_point):
-        for obstacle, obstacle_type in obstacles:
-            inside = False
-            if type(obstacle) is Circle:
-                if (
-                    np.linalg.norm(sample_point - obstacle.get_center())
-                    <= obstacle.get_radius()
-                ):
-                    inside = True
-            elif type(obstacle) is Ellipse:
-                x = (sample_point[0] - obstacle.get_center()[0]) / (
-                    obstacle.get_width() / 2
-                )
-                y = (sample_point[1] - obstacle.get_center()[1]) / (
-                    obstacle.get_height() / 2
-                )
-                if x**2 + y**2 <= 1:
-                    inside = True
-            elif type(obstacle) is Rectangle:
-                upper_left = obstacle.get_corner(UL)
-                lower_right = obstacle.get_corner(DR)
-                if (
-                    upper_left[0] <= sample_point[0] <= lower_right[0]
-                    and lower_right[1] <= sample_point[1] <= upper_left[1]
-                ):
-                    inside = True
-            if obstacle_type == ObstacleType.NEGATIVE_SPACE:
-                inside = not inside
-
-            if inside:
-                return True
-        return False
-
-    return is_in
+# Simulation tick of time-scaled scenarios, independent of the frame rate
+PHYSICS_DT = 1 / 60
+# Every how many beams are cast, from full detail to coarsest, stepped through
+# when casts overrun the time budget
+RAY_DETAIL_STRIDES = (1, 2, 4, 8)
 
 
 def ray_updater(
     car: Mobject,
     car_angle: ValueTracker,
     rays: list[Line],
-    is_outside,
+    obstacles: PolygonObstacles,
     max_ray_length=20,
-    dx=0.1,
-    binary_search_iterations=10,
     use_disparity_extender=False,
     threshold: float = 2.0,
     bubble_size: float = 0.3,
+    time_budget: float | None = None,
+    refine_disparities: bool = False,
+    coarse_stride: int = 8,
 ):
-    def update_rays(mob: Mobject, dt: float):
-        angles = np.linspace(
-            car_angle.get_value() - np.pi / 2,
-            car_angle.get_value() + np.pi / 2,
-            len(rays),
-        )
-        for ray, angle in zip(
-            rays,
-            angles,
-        ):
-            unit_vector = np.cos(angle) * RIGHT + np.sin(angle) * UP
-            for t in np.arange(0, max_ray_length, dx):
-                sample_point = car.get_center() + t * unit_vector
-
-                if is_outside(sample_point):
-                    low, high = t - dx, t
-                    for _ in range(binary_search_iterations):
-                        mid = (low + high) / 2
-                        mid_point = car.get_center() + mid * unit_vector
-                        if is_outside(mid_point):
-                            high = mid
-                        else:
-                            low = mid
-                    sample_point = car.get_center() + high * unit_vector
-                    ray.put_start_and_end_on(car.get_center(), sample_point)
-                    break
+    """
+    Updater that casts `rays` from the car and ends each at the first obstacle.
+
+    Every beam is intersected with the obstacle outlines exactly and all beams
+    are cast in one batch. The scan is cleaned like a real one, so beams that
+    hit nothing end at `max_ray_length`.
+
+    With a `time_budget` in seconds, a frame whose cast takes longer drops to
+    the next of RAY_DETAIL_STRIDES and casts only every stride-th beam and the
+    last one. The beams in between are interpolated, so every ray and the
+    controller reading them still get a full-resolution scan. Detail comes back
+    one level at a time once casts take less than half the budget. Leave it
+    unset for renders, which must not depend on timing.
+
+    With `refine_disparities`, the cast beams go through
+    PolygonObstacles.cast_refined: only every `coarse_stride`-th one is cast at
+    first, and beams are added only where neighbouring ranges jump by more
+    than `threshold` or stop seeing the same wall. It casts a fraction of the
+    beams, which pays off with the NumPy kernels.
+    """
+    scan = ScanConfig(-np.pi / 2, np.pi / 2, len(rays), range_max=max_ray_length)
+    beams = np.arange(len(rays))
+    detail_level = 0
 
+    def update_rays(mob: Mobject, dt: float):
+        nonlocal detail_level
+        angles = car_angle.get_value() + scan.angles
+        unit_vectors = [np.cos(angle) * RIGHT + np.sin(angle) * UP for angle in angles]
+        origin = car.get_center()
+        start_time = time.perf_counter()
+        cast = np.union1d(beams[:: RAY_DETAIL_STRIDES[detail_level]], beams[-1:])
+        if refine_disparities:
+            ranges = obstacles.cast_refined(
+                origin, angles[cast], np.inf, threshold, coarse_stride
+            )
+        else:
+            ranges = obstacles.cast(origin, angles[cast], np.inf)
+        lidar_range_array = np.interp(beams, cast, scan.clean(ranges))
+        if time_budget is not None:
+            elapsed = time.perf_counter() - start_time
+            if elapsed > time_budget:
+                detail_level = min(detail_level + 1, len(RAY_DETAIL_STRIDES) - 1)
+            elif elapsed < time_budget / 2:
+                detail_level = max(detail_level - 1, 0)
         if use_disparity_extender:
-            lidar_range_array = np.array([ray.get_length() for ray in rays])
-            disparities = np.where(abs(np.diff(lidar_range_array)) > threshold)[0]
-            for d in disparities:
-                if lidar_range_array[d] < lidar_range_array[d + 1]:
-                    bubble_indices = int(
-                        bubble_size
-                        * len(lidar_range_array)
-                        / (lidar_range_array[d] * np.pi)
-                    )
-                    lidar_range_array[d + 1 : d + bubble_indices + 2] = (
-                        lidar_range_array[d]
-                    )
-                else:
-                    bubble_indices = int(
-                        bubble_size
-                        * len(lidar_range_array)
-                        / (lidar_range_array[d + 1] * np.pi)
-                    )
-                    lidar_range_array[d - bubble_indices : d + 1] = lidar_range_array[
-                        d + 1
-                    ]
-            for i, ray in enumerate(rays):
-                angle = angles[i]
-                unit_vector = np.cos(angle) * RIGHT + np.sin(angle) * UP
-                ray.put_start_and_end_on(
-                    car.get_center(),
-                    car.get_center() + lidar_range_array[i] * unit_vector,
-                )
+            lidar_range_array = extend_disparities(
+                lidar_range_array, threshold, bubble_size
+            )
+        for ray, length, unit_vector in zip(
+            rays, lidar_range_array, unit_vectors, strict=True
+        ):
+            ray.put_start_and_end_on(origin, origin + length * unit_vector)
 
     return update_rays
 
@@ -130,6 +98,7 @@ def car_updater(
     rays: list[Line],
     window_approach: bool = False,
     window_size: int = 13,
+    integrator: str = "semi_implicit_euler",
 ):
     previous_max_ray = None
 
@@ -140,16 +109,7 @@ def car_updater(
 
         if window_approach:
             lidar_range_array = np.array([ray.get_length() for ray in rays])
-            best_index = 0
-            best_min_distance = 0.0
-
-            for i in range(len(lidar_range_array) - window_size + 1):
-                window = lidar_range_array[i : i + window_size]
-                min_distance = np.min(window)
-
-                if min_distance > best_min_distance:
-                    best_min_distance = min_distance
-                    best_index = i
+            best_index = best_window(lidar_range_array, window_size)
 
             if previous_max_ray is not None:
                 for ray in previous_max_ray:
@@ -171,19 +131,234 @@ def car_updater(
         rotation = np.clip(
             0.1 * (target_angle - car_angle.get_value()), -2 * dt, 2 * dt
         )
-        car.rotate(rotation)
-        car_angle.increment_value(rotation)
-
-        forward_direction = np.array(
-            [np.cos(car_angle.get_value()), np.sin(car_angle.get_value()), 0]
+        x, y, _ = car.get_center()
+        x, y, heading = integrate_pose(
+            [x, y, car_angle.get_value()],
+            car_velocity.get_value(),
+            rotation / dt if dt > 0 else 0.0,
+            dt,
+            integrator,
         )
-        car.shift(car_velocity.get_value() * dt * forward_direction)
+        car.rotate(heading - car_angle.get_value())
+        car_angle.set_value(heading)
+        car.move_to([x, y, 0])
 
     return update_car
 
 
-class Lab2(Scene):
-    def construct(self):
+def time_scaled_updater(
+    steps: list[tuple[Mobject, Callable]],
+    time_scale: float,
+    stop_condition: Callable[[], bool],
+    physics_dt: float = PHYSICS_DT,
+):
+    """
+    Updater that plays a simulation `time_scale` times faster than real time.
+
+    The simulation advances in fixed ticks of `physics_dt`, whatever the frame
+    rate, and a frame of dt runs the ticks that fall within the time_scale * dt
+    it simulates, so a remainder carries over to the next frame. Each tick
+    calls every (mobject, updater) pair in order, as the scene itself would,
+    and only the state after the last tick of a frame is drawn. Ticking stops
+    as soon as `stop_condition` holds, so the last frame shows the exact state
+    it stopped in.
+    """
+    simulated_time = 0.0
+    ticks = 0
+
+    def update(mob: Mobject, dt: float):
+        nonlocal simulated_time, ticks
+        simulated_time += time_scale * dt
+        # Counted from the total, so float error can't drop or add a tick
+        while ticks < int(simulated_time / physics_dt + 1e-6):
+            ticks += 1
+            for mobject, updater in steps:
+                updater(mobject, physics_dt)
+            if stop_condition():
+                return
+
+    return update
+
+
+@dataclass
+class Track:
+    """Walls of a layout, its collision test and where the car starts"""
+
+    obstacles: VGroup
+    is_outside: PolygonObstacles
+    start: np.ndarray
+    heading: float
+    cast_during_intro: bool = False
+
+
+def obstacle_course() -> Track:
+    """Three round obstacles inside a rectangle"""
+    bounding_rectangle = Rectangle(width=12, height=6)
+    obstacle_1 = Circle(radius=1, stroke_color=WHITE, stroke_width=4).shift(
+        RIGHT * 2 + UP * 2
+    )
+    obstacle_2 = Circle(radius=1.5, stroke_color=WHITE, stroke_width=4).shift(
+        DOWN * 1.5
+    )
+    obstacle_3 = Circle(radius=1, stroke_color=WHITE, stroke_width=4).shift(
+        LEFT * 2 + UP * 0.5
+    )
+    return Track(
+        obstacles=VGroup(bounding_rectangle, obstacle_1, obstacle_2, obstacle_3),
+        is_outside=PolygonObstacles(
+            (obstacle_1, ObstacleType.POSITIVE_SPACE),
+            (obstacle_2, ObstacleType.POSITIVE_SPACE),
+            (obstacle_3, ObstacleType.POSITIVE_SPACE),
+            (bounding_rectangle, ObstacleType.NEGATIVE_SPACE),
+        ),
+        start=LEFT * 4 + DOWN,
+        heading=0.0,
+    )
+
+
+def ellipse_track() -> Track:
+    """Oval track between two ellipses"""
+    track_outer = Ellipse(width=6, height=8, stroke_color=WHITE, stroke_width=4)
+    track_inner = Ellipse(width=3, height=5, stroke_color=WHITE, stroke_width=4)
+    return Track(
+        obstacles=VGroup(track_outer, track_inner),
+        is_outside=PolygonObstacles(
+            (track_inner, ObstacleType.POSITIVE_SPACE),
+            (track_outer, ObstacleType.NEGATIVE_SPACE),
+        ),
+        start=LEFT * 2.5 + DOWN,
+        heading=np.pi / 2,
+        cast_during_intro=True,
+    )
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """
+    One follow-the-gap run for Lab2.run_scenario.
+
+    Args:
+        layout: builds the track the car drives on
+        num_rays: rays the car casts and steers with
+        heading: starting heading, the layout's own if None
+        time_scale: how many times faster than real time the run plays, so it
+            also lasts up to this many times longer. Above 1 the simulation
+            steps in fixed ticks of PHYSICS_DT
+    """
+
+    layout: Callable[[], Track]
+    num_rays: int = 60
+    ray_width: float = 0.5
+    use_disparity_extender: bool = False
+    window_approach: bool = False
+    heading: float | None = None
+    time_scale: float = 1
+
+
+SCENARIOS = {
+    "naive_obstacles": Scenario(obstacle_course, num_rays=15, ray_width=2),
+    "naive_track": Scenario(ellipse_track, num_rays=15, ray_width=2),
+    "disparity_obstacles": Scenario(obstacle_course, use_disparity_extender=True),
+    "disparity_track": Scenario(ellipse_track, use_disparity_extender=True),
+    "window_obstacles": Scenario(
+        obstacle_course, window_approach=True, heading=np.pi / 4
+    ),
+    "window_track": Scenario(ellipse_track, window_approach=True),
+    "window_laps": Scenario(ellipse_track, window_approach=True, time_scale=4),
+}
+
+
+class Lab2(SectionedScene):
+    def run_scenario(self, scenario: Scenario):
+        """Drive the car through a scenario until it crashes or time runs out"""
+        track = scenario.layout()
+        heading = track.heading if scenario.heading is None else scenario.heading
+        car = (
+            get_image("labs/lab1/car_topview.png")
+            .scale(0.1)
+            .rotate(heading)
+            .shift(track.start)
+        )
+        car_velocity = ValueTracker(0)
+        car_angle = ValueTracker(heading)
+
+        rays = [
+            Line(
+                car.get_center(),
+                car.get_center(),
+                stroke_width=scenario.ray_width,
+                color=RED,
+            )
+            for _ in range(scenario.num_rays)
+        ]
+        # The controller always sees every ray, a draft only draws fewer of them
+        drawn = np.linspace(
+            0, len(rays) - 1, self.quality.get_ray_count(len(rays))
+        ).round()
+        rays_group = VGroup(*(rays[int(i)] for i in np.unique(drawn)))
+        rays_updater_instance = ray_updater(
+            car,
+            car_angle,
+            rays,
+            track.is_outside,
+            use_disparity_extender=scenario.use_disparity_extender,
+            # Only a live preview trades detail for frame rate. The cast gets
+            # half of each frame and is refined from a coarse fan, which beats a
+            # full cast with the NumPy kernels
+            time_budget=0.5 / self.camera.fps if self.window else None,
+            refine_disparities=bool(self.window) and BACKEND == "numpy",
+        )
+        if track.cast_during_intro:
+            rays_group.add_updater(rays_updater_instance)
+
+        labels = []
+        if scenario.time_scale != 1:
+            labels.append(Text(f"{scenario.time_scale:g}x speed").to_corner(UR))
+
+        self.play(
+            FadeIn(car),
+            FadeIn(rays_group),
+            Write(track.obstacles),
+            *map(FadeIn, labels),
+        )
+        if not track.cast_during_intro:
+            rays_group.add_updater(rays_updater_instance)
+        self.wait()
+        car_updater_instance = car_updater(
+            car_velocity,
+            car_angle,
+            rays,
+            window_approach=scenario.window_approach,
+        )
+
+        def crashed():
+            return track.is_outside.contains(car.get_points()).any()
+
+        if scenario.time_scale == 1:
+            car.add_updater(car_updater_instance)
+        else:
+            # The car and its rays tick together, in the order the scene would
+            # update them, and only the last tick of each frame is drawn
+            rays_group.remove_updater(rays_updater_instance)
+            car_updater_instance = time_scaled_updater(
+                [(car, car_updater_instance), (rays_group, rays_updater_instance)],
+                scenario.time_scale,
+                crashed,
+            )
+            car.add_updater(car_updater_instance)
+        self.wait_until(crashed, max_time=10)
+        car.remove_updater(car_updater_instance)
+        rays_group.remove_updater(rays_updater_instance)
+        self.wait()
+        self.play(
+            FadeOut(car),
+            FadeOut(rays_group),
+            FadeOut(track.obstacles),
+            *map(FadeOut, labels),
+        )
+
+    @section
+    def title(self):
         # Title
         title = TexText("F1tenth Lab 2:").shift(1 * UP)
         title2 = TexText("Follow The Gap")
@@ -193,6 +368,8 @@ class Lab2(Scene):
         self.wait()
         self.play(FadeOut(title), FadeOut(title2))
 
+    @section
+    def outline(self):
         # Outline
         outline = TexText(
             "Outline:\\\\",
@@ -204,6 +381,8 @@ class Lab2(Scene):
         self.wait()
         self.play(FadeOut(outline))
 
+    @section
+    def naive_approach(self):
         # Naive Approach
         title = TexText("Naive Approach")
         self.play(Write(title))
@@ -217,113 +396,18 @@ class Lab2(Scene):
         self.wait()
         self.play(FadeOut(title2))
 
+    @section
+    def visualize_naive_approach_with_obstacles(self):
         # Visualize Naive Approach With Obstacles
-        car = (
-            ImageMobject("labs/lab1/car_topview.png").scale(0.1).shift(LEFT * 4 + DOWN)
-        )
-        self.add(car)
-        car_velocity = ValueTracker(0)
-        car_angle = ValueTracker(0)
-
-        bounding_rectangle = Rectangle(width=12, height=6)
-        obstacle_1 = Circle(radius=1, stroke_color=WHITE, stroke_width=4).shift(
-            RIGHT * 2 + UP * 2
-        )
-        obstacle_2 = Circle(radius=1.5, stroke_color=WHITE, stroke_width=4).shift(
-            DOWN * 1.5
-        )
-
-        obstacle_3 = Circle(radius=1, stroke_color=WHITE, stroke_width=4).shift(
-            LEFT * 2 + UP * 0.5
-        )
-        obstacles = VGroup(bounding_rectangle, obstacle_1, obstacle_2, obstacle_3)
-        is_outside_track = get_is_in(
-            (obstacle_1, ObstacleType.POSITIVE_SPACE),
-            (obstacle_2, ObstacleType.POSITIVE_SPACE),
-            (obstacle_3, ObstacleType.POSITIVE_SPACE),
-            (bounding_rectangle, ObstacleType.NEGATIVE_SPACE),
-        )
-
-        rays = [
-            Line(
-                car.get_center(),
-                car.get_center(),
-                stroke_width=2,
-                color=RED,
-            )
-            for _ in range(15)
-        ]
-        rays_group = VGroup(*rays)
-        rays_updater_instance = ray_updater(car, car_angle, rays, is_outside_track)
-
-        self.play(
-            FadeIn(car),
-            FadeIn(rays_group),
-            Write(obstacles),
-        )
-        rays_group.add_updater(rays_updater_instance)
-        self.wait()
-        car_updater_instance = car_updater(car_velocity, car_angle, rays)
-
-        car.add_updater(car_updater_instance)
-        self.wait_until(
-            lambda: sum(is_outside_track(corner) for corner in car.get_points()) >= 1,
-            max_time=10,
-        )
-        car.remove_updater(car_updater_instance)
-        rays_group.remove_updater(rays_updater_instance)
-        self.wait()
-        self.play(FadeOut(car), FadeOut(rays_group), FadeOut(obstacles))
+        self.run_scenario(SCENARIOS["naive_obstacles"])
 
+    @section
+    def visualize_naive_approach_on_track(self):
         # Visualize Naive Approach On Track
-        car = (
-            ImageMobject("labs/lab1/car_topview.png")
-            .scale(0.1)
-            .rotate(PI / 2)
-            .shift(LEFT * 2.5 + DOWN)
-        )
-        car_velocity = ValueTracker(0)
-        car_angle = ValueTracker(np.pi / 2)
-
-        track_outer = Ellipse(width=6, height=8, stroke_color=WHITE, stroke_width=4)
-        track_inner = Ellipse(width=3, height=5, stroke_color=WHITE, stroke_width=4)
-        obstacles = VGroup(track_outer, track_inner)
-        is_outside_track = get_is_in(
-            (track_inner, ObstacleType.POSITIVE_SPACE),
-            (track_outer, ObstacleType.NEGATIVE_SPACE),
-        )
-
-        rays = [
-            Line(
-                car.get_center(),
-                car.get_center(),
-                stroke_width=2,
-                color=RED,
-            )
-            for _ in range(15)
-        ]
-        rays_group = VGroup(*rays)
-        rays_updater_instance = ray_updater(car, car_angle, rays, is_outside_track)
-        rays_group.add_updater(rays_updater_instance)
-
-        self.play(
-            FadeIn(car),
-            FadeIn(rays_group),
-            Write(obstacles),
-        )
-        self.wait()
-        car_updater_instance = car_updater(car_velocity, car_angle, rays)
-
-        car.add_updater(car_updater_instance)
-        self.wait_until(
-            lambda: sum(is_outside_track(corner) for corner in car.get_points()) >= 1,
-            max_time=10,
-        )
-        car.remove_updater(car_updater_instance)
-        rays_group.remove_updater(rays_updater_instance)
-        self.wait()
-        self.play(FadeOut(car), FadeOut(rays_group), FadeOut(obstacles))
+        self.run_scenario(SCENARIOS["naive_track"])
 
+    @section
+    def disparity_extender(self):
         # Disparity Extender
         title = TexText("Disparity Extender")
         self.play(Write(title))
@@ -347,121 +431,18 @@ class Lab2(Scene):
 
         self.play(FadeOut(title3))
 
+    @section
+    def visualize_disparity_extender_with_obstacles(self):
         # Visualize Disparity Extender With Obstacles
-        car = (
-            ImageMobject("labs/lab1/car_topview.png").scale(0.1).shift(LEFT * 4 + DOWN)
-        )
-        self.add(car)
-        car_velocity = ValueTracker(0)
-        car_angle = ValueTracker(0)
-
-        bounding_rectangle = Rectangle(width=12, height=6)
-        obstacle_1 = Circle(radius=1, stroke_color=WHITE, stroke_width=4).shift(
-            RIGHT * 2 + UP * 2
-        )
-        obstacle_2 = Circle(radius=1.5, stroke_color=WHITE, stroke_width=4).shift(
-            DOWN * 1.5
-        )
-
-        obstacle_3 = Circle(radius=1, stroke_color=WHITE, stroke_width=4).shift(
-            LEFT * 2 + UP * 0.5
-        )
-        obstacles = VGroup(bounding_rectangle, obstacle_1, obstacle_2, obstacle_3)
-        is_outside_track = get_is_in(
-            (obstacle_1, ObstacleType.POSITIVE_SPACE),
-            (obstacle_2, ObstacleType.POSITIVE_SPACE),
-            (obstacle_3, ObstacleType.POSITIVE_SPACE),
-            (bounding_rectangle, ObstacleType.NEGATIVE_SPACE),
-        )
-
-        rays = [
-            Line(
-                car.get_center(),
-                car.get_center(),
-                stroke_width=0.5,
-                color=RED,
-            )
-            for _ in range(60)
-        ]
-        rays_group = VGroup(*rays)
-        rays_updater_instance = ray_updater(
-            car, car_angle, rays, is_outside_track, use_disparity_extender=True
-        )
-
-        self.play(
-            FadeIn(car),
-            FadeIn(rays_group),
-            Write(obstacles),
-        )
-        rays_group.add_updater(rays_updater_instance)
-        self.wait()
-        car_updater_instance = car_updater(car_velocity, car_angle, rays)
-
-        car.add_updater(car_updater_instance)
-        self.wait_until(
-            lambda: sum(is_outside_track(corner) for corner in car.get_points()) >= 1,
-            max_time=10,
-        )
-        car.remove_updater(car_updater_instance)
-        rays_group.remove_updater(rays_updater_instance)
-        self.wait()
-        self.play(FadeOut(car), FadeOut(rays_group), FadeOut(obstacles))
+        self.run_scenario(SCENARIOS["disparity_obstacles"])
 
+    @section
+    def visualize_disparity_extender_on_track(self):
         # Visualize Disparity Extender On Track
-        car = (
-            ImageMobject("labs/lab1/car_topview.png")
-            .scale(0.1)
-            .rotate(PI / 2)
-            .shift(LEFT * 2.5 + DOWN)
-        )
-        car_velocity = ValueTracker(0)
-        car_angle = ValueTracker(np.pi / 2)
-
-        track_outer = Ellipse(width=6, height=8, stroke_color=WHITE, stroke_width=4)
-        track_inner = Ellipse(width=3, height=5, stroke_color=WHITE, stroke_width=4)
-        obstacles = VGroup(track_outer, track_inner)
-        is_outside_track = get_is_in(
-            (track_inner, ObstacleType.POSITIVE_SPACE),
-            (track_outer, ObstacleType.NEGATIVE_SPACE),
-        )
-
-        rays = [
-            Line(
-                car.get_center(),
-                car.get_center(),
-                stroke_width=0.5,
-                color=RED,
-            )
-            for _ in range(60)
-        ]
-        rays_group = VGroup(*rays)
-        rays_updater_instance = ray_updater(
-            car,
-            car_angle,
-            rays,
-            is_outside_track,
-            use_disparity_extender=True,
-        )
-        rays_group.add_updater(rays_updater_instance)
-
-        self.play(
-            FadeIn(car),
-            FadeIn(rays_group),
-            Write(obstacles),
-        )
-        self.wait()
-        car_updater_instance = car_updater(car_velocity, car_angle, rays)
-
-        car.add_updater(car_updater_instance)
-        self.wait_until(
-            lambda: sum(is_outside_track(corner) for corner in car.get_points()) >= 1,
-            max_time=10,
-        )
-        car.remove_updater(car_updater_instance)
-        rays_group.remove_updater(rays_updater_instance)
-        self.wait()
-        self.play(FadeOut(car), FadeOut(rays_group), FadeOut(obstacles))
+        self.run_scenario(SCENARIOS["disparity_track"])
 
+    @section
+    def what_is_a_disparity(self):
         # What is a Disparity?
         title = TexText("What is a Disparity?")
         self.play(Write(title))
@@ -485,12 +466,15 @@ class Lab2(Scene):
         self.wait()
         self.play(FadeOut(title4))
 
+    @section
+    def how_many_rays_do_we_cut(self):
         # How many rays do we cut?
         title = TexText("How many rays do we cut?")
         self.play(Write(title))
         self.wait()
         self.play(FadeOut(title))
 
+        rng = np.random.default_rng(self.random_seed)
         rays = [
             Line(
                 BOTTOM + LEFT_SIDE,
@@ -498,7 +482,7 @@ class Lab2(Scene):
                 + LEFT_SIDE
                 + np.cos(angle)
                 * RIGHT
-                * ((8 if i >= 6 else 4) + (rand_offset := np.random.uniform(-0.5, 0.5)))
+                * ((8 if i >= 6 else 4) + (rand_offset := rng.uniform(-0.5, 0.5)))
                 + np.sin(angle) * UP * ((8 if i >= 6 else 4) + rand_offset),
                 stroke_width=2,
                 color=RED,
@@ -611,6 +595,8 @@ class Lab2(Scene):
             FadeOut(disparity_percent4),
         )
 
+    @section
+    def window_approach(self):
         # Window Approach
         title = TexText("Window Approach")
         self.play(Write(title))
@@ -632,117 +618,23 @@ class Lab2(Scene):
 
         self.play(FadeOut(title3), FadeOut(title2))
 
+    @section
+    def visualize_window_approach_with_obstacles(self):
         # Visualize Window Approach With Obstacles
-        car = (
-            ImageMobject("labs/lab1/car_topview.png").scale(0.1).shift(LEFT * 4 + DOWN)
-        ).rotate(np.pi / 4)
-        self.add(car)
-        car_velocity = ValueTracker(0)
-        car_angle = ValueTracker(np.pi / 4)
-
-        bounding_rectangle = Rectangle(width=12, height=6)
-        obstacle_1 = Circle(radius=1, stroke_color=WHITE, stroke_width=4).shift(
-            RIGHT * 2 + UP * 2
-        )
-        obstacle_2 = Circle(radius=1.5, stroke_color=WHITE, stroke_width=4).shift(
-            DOWN * 1.5
-        )
-
-        obstacle_3 = Circle(radius=1, stroke_color=WHITE, stroke_width=4).shift(
-            LEFT * 2 + UP * 0.5
-        )
-        obstacles = VGroup(bounding_rectangle, obstacle_1, obstacle_2, obstacle_3)
-        is_outside_track = get_is_in(
-            (obstacle_1, ObstacleType.POSITIVE_SPACE),
-            (obstacle_2, ObstacleType.POSITIVE_SPACE),
-            (obstacle_3, ObstacleType.POSITIVE_SPACE),
-            (bounding_rectangle, ObstacleType.NEGATIVE_SPACE),
-        )
-
-        rays = [
-            Line(
-                car.get_center(),
-                car.get_center(),
-                stroke_width=0.5,
-                color=RED,
-            )
-            for _ in range(60)
-        ]
-        rays_group = VGroup(*rays)
-        rays_updater_instance = ray_updater(car, car_angle, rays, is_outside_track)
-
-        self.play(
-            FadeIn(car),
-            FadeIn(rays_group),
-            Write(obstacles),
-        )
-        rays_group.add_updater(rays_updater_instance)
-        self.wait()
-        car_updater_instance = car_updater(
-            car_velocity, car_angle, rays, window_approach=True
-        )
-
-        car.add_updater(car_updater_instance)
-        self.wait_until(
-            lambda: sum(is_outside_track(corner) for corner in car.get_points()) >= 1,
-            max_time=10,
-        )
-        car.remove_updater(car_updater_instance)
-        rays_group.remove_updater(rays_updater_instance)
-        self.wait()
-        self.play(FadeOut(car), FadeOut(rays_group), FadeOut(obstacles))
+        self.run_scenario(SCENARIOS["window_obstacles"])
 
+    @section
+    def visualize_window_approach_on_track(self):
         # Visualize Window Approach On Track
-        car = (
-            ImageMobject("labs/lab1/car_topview.png")
-            .scale(0.1)
-            .rotate(PI / 2)
-            .shift(LEFT * 2.5 + DOWN)
-        )
-        car_velocity = ValueTracker(0)
-        car_angle = ValueTracker(np.pi / 2)
+        self.run_scenario(SCENARIOS["window_track"])
 
-        track_outer = Ellipse(width=6, height=8, stroke_color=WHITE, stroke_width=4)
-        track_inner = Ellipse(width=3, height=5, stroke_color=WHITE, stroke_width=4)
-        obstacles = VGroup(track_outer, track_inner)
-        is_outside_track = get_is_in(
-            (track_inner, ObstacleType.POSITIVE_SPACE),
-            (track_outer, ObstacleType.NEGATIVE_SPACE),
-        )
-
-        rays = [
-            Line(
-                car.get_center(),
-                car.get_center(),
-                stroke_width=0.5,
-                color=RED,
-            )
-            for _ in range(60)
-        ]
-        rays_group = VGroup(*rays)
-        rays_updater_instance = ray_updater(car, car_angle, rays, is_outside_track)
-        rays_group.add_updater(rays_updater_instance)
-
-        self.play(
-            FadeIn(car),
-            FadeIn(rays_group),
-            Write(obstacles),
-        )
-        self.wait()
-        car_updater_instance = car_updater(
-            car_velocity, car_angle, rays, window_approach=True
-        )
-
-        car.add_updater(car_updater_instance)
-        self.wait_until(
-            lambda: sum(is_outside_track(corner) for corner in car.get_points()) >= 1,
-            max_time=10,
-        )
-        car.remove_updater(car_updater_instance)
-        rays_group.remove_updater(rays_updater_instance)
-        self.wait()
-        self.play(FadeOut(car), FadeOut(rays_group), FadeOut(obstacles))
+    @section
+    def visualize_window_approach_over_laps(self):
+        # Visualize Window Approach Over Several Laps
+        self.run_scenario(SCENARIOS["window_laps"])
 
+    @section
+    def conclusion(self):
         # conclusion
         title = TexText("Thanks for Listening!")
         self.play(Write(title))
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from labs.common.integrators import INTEGRATORS, integrate_pose
+
+START = np.array([0.0, 0.0, 0.3])
+SPEED = 1.5
+OMEGA = 2.0
+DURATION = 2.0
+
+
+def exact_pose(pose: np.ndarray, speed: float, omega: float, t: float) -> np.ndarray:
+    """Closed-form unicycle pose, driving an arc of radius speed / omega"""
+    x, y, heading = pose
+    radius = speed / omega
+    return np.array(
+        [
+            x + radius * (np.sin(heading + omega * t) - np.sin(heading)),
+            y - radius * (np.cos(heading + omega * t) - np.cos(heading)),
+            heading + omega * t,
+        ]
+    )
+
+
+def get_error(method: str, steps: int) -> float:
+    pose = START
+    for _ in range(steps):
+        pose = integrate_pose(pose, SPEED, OMEGA, DURATION / steps, method)
+    return np.abs(pose - exact_pose(START, SPEED, OMEGA, DURATION)).max()
+
+
+@pytest.mark.parametrize("method", ["euler", "semi_implicit_euler"])
+def test_first_order_error_halves_with_step(method):
+    assert get_error(method, 8) / get_error(method, 16) == pytest.approx(2, rel=0.1)
+
+
+def test_rk4_is_fourth_order():
+    assert get_error("rk4", 4) < 1e-3
+    assert get_error("rk4", 8) / get_error("rk4", 16) == pytest.approx(16, rel=0.1)
+
+
+def test_adaptive_stays_accurate_at_large_steps():
+    # Half-second frames, where rk4 is still off by about 1e-4
+    assert get_error("adaptive", 4) < 1e-6
+
+
+@pytest.mark.parametrize("method", INTEGRATORS)
+def test_batched_poses_match_single_poses(method):
+    poses = np.array([[0.0, 0.0, 0.0], [1.0, -2.0, 1.0], [3.0, 0.5, -2.0]])
+    speeds = np.array([1.0, 0.5, 2.0])
+    omegas = np.array([0.0, 1.0, -3.0])
+    batched = integrate_pose(poses, speeds, omegas, 0.1, method)
+    # adaptive picks its substeps from the worst pose of a batch, so it only
+    # agrees to within its tolerance
+    for pose, speed, omega, expected in zip(
+        poses, speeds, omegas, batched, strict=True
+    ):
+        np.testing.assert_allclose(
+            integrate_pose(pose, speed, omega, 0.1, method), expected, atol=1e-6
+        )
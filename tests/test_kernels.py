@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from labs.common.kernels import (
+    best_window_loops,
+    best_window_reference,
+    cast_fan_loops,
+    cast_fan_reference,
+    compile_kernels,
+    get_directions,
+)
+from labs.common.wall_following import polyline_walls
+
+
+def get_scene(seed: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(origin, angles, segments) of a winding corridor and a random pose in it"""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(-10, 10, 60)
+    centerline = np.stack([x, rng.uniform(1, 3) * np.sin(x / 3)], axis=-1)
+    segments = polyline_walls(centerline + [0, 1.5], centerline - [0, 1.5])
+    origin = np.array([rng.uniform(-5, 5), 0.0])
+    origin[1] = np.interp(origin[0], *centerline.T)
+    angles = rng.uniform(-np.pi, np.pi) + np.linspace(-2.35, 2.35, 271)
+    return origin, angles, segments
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_cast_fan_loops_match_the_reference(seed):
+    origin, angles, segments = get_scene(seed)
+    np.testing.assert_array_equal(
+        cast_fan_loops(origin, get_directions(angles), segments, 10.0),
+        cast_fan_reference(origin, angles, segments, 10.0),
+    )
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_best_window_loops_match_the_reference(seed):
+    origin, angles, segments = get_scene(seed)
+    ranges = cast_fan_reference(origin, angles, segments, 10.0)
+    for window_size in (1, 13, 100):
+        assert best_window_loops(ranges, window_size) == best_window_reference(
+            ranges, window_size
+        )
+
+
+def test_compiled_kernels_match_the_reference():
+    pytest.importorskip("numba")
+    cast_fan, best_window = compile_kernels()
+    for seed in range(3):
+        origin, angles, segments = get_scene(seed)
+        ranges = cast_fan_reference(origin, angles, segments, 10.0)
+        np.testing.assert_array_equal(cast_fan(origin, angles, segments, 10.0), ranges)
+        assert best_window(ranges, 13) == best_window_reference(ranges, 13)
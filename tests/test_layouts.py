@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from labs.common.follow_the_gap import CAR_LENGTH, get_footprint
+from labs.common.layouts import LAYOUT_KINDS, generate_layout
+from labs.common.robustness import CONTROLLERS, evaluate_layout
+
+
+@pytest.mark.parametrize("kind", LAYOUT_KINDS)
+def test_layouts_are_seeded(kind):
+    first, again, other = (generate_layout(kind, seed) for seed in (3, 3, 4))
+    np.testing.assert_array_equal(first.obstacles.segments, again.obstacles.segments)
+    np.testing.assert_array_equal(first.start, again.start)
+    assert first.heading == again.heading
+    assert not np.array_equal(first.start, other.start)
+
+
+@pytest.mark.parametrize("kind", LAYOUT_KINDS)
+def test_car_starts_clear_of_every_wall(kind):
+    for seed in range(100):
+        layout = generate_layout(kind, seed)
+        footprint = get_footprint([*layout.start, layout.heading])
+        # The car and the space a car length ahead of it
+        heading = np.array([np.cos(layout.heading), np.sin(layout.heading)])
+        ahead = footprint + CAR_LENGTH * heading
+        assert not layout.obstacles.contains(np.vstack([footprint, ahead])).any(), seed
+
+
+def test_evaluate_layout_runs_every_controller():
+    results = evaluate_layout("course", 0, dt=1 / 30, duration=1.0)
+    assert [name for name, _, _ in results] == list(CONTROLLERS)
+    for _, crashed, distance in results:
+        assert not crashed
+        assert 0 < distance <= 1.0
@@ -0,0 +1,151 @@
+import sys
+
+import numpy as np
+import pytest
+
+from labs.common.layouts import generate_layout, rectangle_polyline
+from labs.common.obstacles import (
+    ObstacleType,
+    PolygonObstacles,
+    get_polylines,
+    get_segments,
+)
+from labs.common.scan import ScanConfig
+
+ROOM = ([rectangle_polyline([0, 0], 20, 20)], ObstacleType.NEGATIVE_SPACE)
+
+
+def get_poses(obstacles: PolygonObstacles, count: int, seed: int) -> np.ndarray:
+    """Random (x, y, heading) poses that are not inside an obstacle"""
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(-10, 10, size=(20 * count, 2))
+    points = points[~obstacles.contains(points)][:count]
+    return np.column_stack([points, rng.uniform(-np.pi, np.pi, len(points))])
+
+
+@pytest.mark.parametrize("kind", ["course", "track"])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_refined_cast_matches_a_full_cast(kind, seed):
+    obstacles = generate_layout(kind, seed).obstacles
+    for num_beams in (60, 1081):
+        scan = ScanConfig(num_beams=num_beams)
+        for x, y, heading in get_poses(obstacles, 10, seed):
+            angles = heading + scan.angles
+            np.testing.assert_allclose(
+                obstacles.cast_refined([x, y], angles, np.inf, threshold=2.0),
+                obstacles.cast([x, y], angles, np.inf),
+                atol=1e-3,
+            )
+
+
+def test_refined_cast_finds_a_post_between_coarse_beams():
+    post = ([rectangle_polyline([5, 0.12], 0.1, 0.1)], ObstacleType.POSITIVE_SPACE)
+    obstacles = PolygonObstacles(ROOM, post)
+    # Beams every degree, so the post only crosses the beam at 1 degree, between
+    # the coarse beams at 0 and 8 degrees and off the middle one at 4 degrees
+    angles = np.radians(np.arange(-40, 41))
+    ranges = obstacles.cast_refined([0, 0], angles, np.inf, threshold=2.0)
+    np.testing.assert_allclose(ranges, obstacles.cast([0, 0], angles, np.inf))
+    assert ranges.min() < 5
+
+
+def test_refined_cast_interpolates_a_plain_wall(monkeypatch):
+    obstacles = PolygonObstacles(ROOM)
+    cast = obstacles.cast
+    cast_beams = []
+
+    def counted_cast(origin, angles, max_range):
+        cast_beams.extend(angles)
+        return cast(origin, angles, max_range)
+
+    monkeypatch.setattr(obstacles, "cast", counted_cast)
+    angles = np.linspace(-0.7, 0.7, 1081)
+    ranges = obstacles.cast_refined([0, 0], angles, np.inf, threshold=2.0)
+    np.testing.assert_allclose(ranges, 10 / np.cos(angles))
+    assert len(cast_beams) == len(np.arange(0, 1081, 8))
+
+
+def arc_polyline(radius: float, start: float, stop: float) -> np.ndarray:
+    angles = np.linspace(start, stop, 33)
+    return radius * np.stack([np.cos(angles), np.sin(angles)], axis=-1)
+
+
+def test_get_segments_closes_outlines_on_request():
+    polyline = np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0]])
+    np.testing.assert_array_equal(get_segments([polyline])[:, 0], polyline[:-1])
+    closed = get_segments([polyline], close=True)
+    assert len(closed) == 3
+    np.testing.assert_array_equal(closed[-1], [[1, 1], [0, 0]])
+
+
+def test_rotated_rectangle():
+    # 4 by 2 and turned by 45 degrees, so its long side runs along y = x
+    rectangle = rectangle_polyline([0, 0], 4, 2, np.pi / 4)
+    obstacles = PolygonObstacles(([rectangle], ObstacleType.POSITIVE_SPACE))
+    np.testing.assert_array_equal(
+        obstacles.contains(np.array([[0, 0], [1.2, 1.2], [1.2, -1.2], [2, 0]])),
+        [True, True, False, False],
+    )
+    ranges = obstacles.cast([-5, 0], np.array([0.0, np.pi]), np.inf)
+    np.testing.assert_allclose(ranges, [5 - np.sqrt(2), np.inf])
+
+
+def test_outlines_of_one_obstacle_block_together():
+    squares = [rectangle_polyline([-3, 0], 2, 2), rectangle_polyline([3, 0], 2, 2)]
+    obstacles = PolygonObstacles((squares, ObstacleType.POSITIVE_SPACE))
+    np.testing.assert_array_equal(
+        obstacles.contains(np.array([[-3, 0.5], [3, -0.5], [0, 0]])),
+        [True, True, False],
+    )
+    np.testing.assert_allclose(
+        obstacles.cast([0, 0], np.array([0.0, np.pi, np.pi / 2]), np.inf),
+        [2, 2, np.inf],
+    )
+
+
+def test_open_arc_is_closed_for_containment_only():
+    # The upper half of a circle of radius 2, open along its diameter
+    obstacles = PolygonObstacles(
+        ([arc_polyline(2, 0, np.pi)], ObstacleType.POSITIVE_SPACE)
+    )
+    np.testing.assert_array_equal(
+        obstacles.contains(np.array([[0, 1], [0, -1]])), [True, False]
+    )
+    # A beam leaving through the open diameter only stops at the far side
+    ranges = obstacles.cast([0, -1], np.array([np.pi / 2, -np.pi / 2]), np.inf)
+    np.testing.assert_allclose(ranges, [3, np.inf], atol=1e-2)
+
+
+@pytest.fixture
+def manimlib(monkeypatch):
+    # Importing manimlib parses the command line, so give it a bare one
+    monkeypatch.setattr(sys, "argv", ["manimgl"])
+    return pytest.importorskip("manimlib")
+
+
+def test_mobject_outlines(manimlib):
+    rectangle = manimlib.Rectangle(width=4, height=2).rotate(np.pi / 4)
+    squares = manimlib.VGroup(
+        manimlib.Square(2).shift(3 * manimlib.LEFT),
+        manimlib.Square(2).shift(3 * manimlib.RIGHT),
+    )
+    obstacles = PolygonObstacles(
+        (rectangle, ObstacleType.POSITIVE_SPACE),
+        (squares, ObstacleType.POSITIVE_SPACE),
+    )
+    np.testing.assert_array_equal(
+        obstacles.contains(np.array([[1.2, 1.2], [1.2, -1.2], [-3, 0.5], [3, 0]])),
+        [True, False, True, True],
+    )
+    # Straight down onto a long side of the rectangle and onto the right square
+    down = np.array([-np.pi / 2])
+    assert obstacles.cast([0, 3], down, np.inf) == pytest.approx(3 - np.sqrt(2))
+    assert obstacles.cast([3, 3], down, np.inf) == pytest.approx(2)
+
+
+def test_open_arc_polyline_stays_open(manimlib):
+    (polyline,) = get_polylines(manimlib.Arc(0, np.pi, radius=2))
+    np.testing.assert_allclose(polyline[[0, -1]], [[2, 0], [-2, 0]], atol=1e-6)
+    obstacles = PolygonObstacles(([polyline], ObstacleType.POSITIVE_SPACE))
+    ranges = obstacles.cast([0, -1], np.array([np.pi / 2, -np.pi / 2]), np.inf)
+    np.testing.assert_allclose(ranges, [3, np.inf], atol=1e-2)
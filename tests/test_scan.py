@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from labs.common.scan import ANGLE_MAX, ANGLE_MIN, NUM_BEAMS, ScanConfig
+
+
+def test_default_angles_span_the_field_of_view():
+    scan = ScanConfig()
+    assert len(scan.angles) == NUM_BEAMS
+    assert scan.angles[0] == ANGLE_MIN
+    assert scan.angles[-1] == pytest.approx(ANGLE_MAX)
+    np.testing.assert_allclose(np.diff(scan.angles), scan.increment)
+
+
+def test_indices_round_to_the_nearest_beam_and_clip():
+    scan = ScanConfig(-np.pi / 2, np.pi / 2, 5)
+    # Beams at -90, -45, 0, 45 and 90 degrees
+    angles = np.radians([[-90, -70, -60], [0, 30, 200]])
+    indices = scan.get_indices(angles)
+    assert indices.shape == angles.shape
+    np.testing.assert_array_equal(indices, [[0, 0, 1], [2, 3, 4]])
+    assert scan.get_indices(np.radians(-135)) == 0
+
+
+def test_indices_are_memoized_read_only():
+    scan = ScanConfig()
+    first = scan.get_indices([0.0, np.pi / 4])
+    assert scan.get_indices([0.0, np.pi / 4]) is first
+    assert not first.flags.writeable
+
+
+def test_ranges_of_a_batch_of_scans():
+    scan = ScanConfig(-np.pi / 2, np.pi / 2, 5)
+    scans = np.arange(10.0).reshape(2, 5)
+    np.testing.assert_array_equal(
+        scan.get_ranges(scans, np.radians([90, 0])), [[4, 2], [9, 7]]
+    )
+
+
+def test_clean_follows_rep_117():
+    scan = ScanConfig(num_beams=6, range_min=0.1, range_max=10.0)
+    scans = np.array([np.inf, -np.inf, 3.0, 0.05, 12.0, 4.0])
+    np.testing.assert_array_equal(scan.clean(scans), [10, 0.1, 3, 0.1, 10, 4])
+
+
+def test_clean_never_reads_nan_as_open_space():
+    scan = ScanConfig(num_beams=6, range_min=0.1, range_max=10.0)
+    scans = np.array(
+        [
+            [2.0, np.nan, np.nan, 5.0, np.nan, np.inf],
+            [np.nan, np.nan, 1.0, np.nan, 3.0, 4.0],
+        ]
+    )
+    # A NaN holds the last valid reading, or range_min at the start of a scan
+    np.testing.assert_array_equal(
+        scan.clean(scans), [[2, 2, 2, 5, 5, 10], [0.1, 0.1, 1, 1, 3, 4]]
+    )